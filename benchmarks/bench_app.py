@@ -0,0 +1,289 @@
+"""
+Offline end-to-end benchmark of the API.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the local stand-ins in
+`standins.py`: an in-memory Motor-compatible store, an in-memory Redis, an HTTP
+fixture server with documents of various sizes and a fake SQS queue. No MongoDB,
+Redis or AWS access is needed.
+
+For every scenario it reports throughput, latency percentiles and Python heap
+allocations per request (peak and retained, from tracemalloc in a separate
+sequential pass), and writes everything to JSON. Pass a previous result with
+`--compare` to print the change per scenario.
+
+    uv run python benchmarks/bench_app.py [--requests 500] [--concurrency 8] [--json bench_app.json]
+    uv run python benchmarks/bench_app.py --only chat_cold_large,execute_agent --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+
+from standins import FakeMongoClient, FakeQueue, FakeRedis, FixtureServer, html_document
+
+DOCUMENT_SIZES = {"small": 4 * 1024, "medium": 100 * 1024, "large": 1024 * 1024}
+CATEGORIES = ["finance", "sales", "support", "ops"]
+
+@dataclass
+class Scenario:
+    name: str
+    call: Callable[[httpx.AsyncClient], Awaitable[int]] # Returns the status code
+    expected_status: int = 200
+    before: Optional[Callable[[], None]] = None # Run before each call, untimed
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+def install_standins(settings) -> Dict[str, Any]:
+    """Point the service singletons at the stand-ins."""
+    from mugeshbabu_agents.infrastructure.db import DEFAULT_CLUSTER, db_manager
+    from mugeshbabu_agents.infrastructure.redis_client import redis_manager
+    from mugeshbabu_agents.domain.agents.service import agent_service
+
+    mongo = FakeMongoClient()
+    db_manager.client = mongo
+    db_manager._clients[DEFAULT_CLUSTER] = mongo
+    db_manager.master_db = mongo[settings.mongo.db_name]
+
+    redis = FakeRedis()
+    redis_manager._client = redis
+
+    queue = FakeQueue()
+    agent_service.push_to_sqs = queue.push
+    agent_service.push_to_sqs_batch = queue.push_batch
+    return {"mongo": mongo, "redis": redis, "queue": queue, "db": db_manager.master_db}
+
+def seed(db, agents: int) -> Dict[str, str]:
+    """Agents across categories, a large dynamic team and a small static one."""
+    from mugeshbabu_agents.domain.agents.models import Agent
+    from mugeshbabu_agents.domain.teams.models import Team
+
+    agent_ids = []
+    for i in range(agents):
+        agent = Agent(name=f"Agent {i}", description="Benchmark agent", system_prompt="You are a helpful assistant.")
+        doc = agent.model_dump(by_alias=True)
+        doc["category"] = CATEGORIES[i % len(CATEGORIES)]
+        db.agents.docs[doc["_id"]] = doc
+        agent_ids.append(str(doc["_id"]))
+
+    large = Team(name="Finance", agent_ids=agent_ids[1:40:4], dynamic_filters={"category": "finance"})
+    small = Team(name="Core", agent_ids=agent_ids[:20])
+    for team in (large, small):
+        doc = team.model_dump(by_alias=True)
+        db.teams.docs[doc["_id"]] = doc
+    return {"large_team": str(large.id), "small_team": str(small.id), "agent": agent_ids[0]}
+
+def build_scenarios(fixtures: FixtureServer, ids: Dict[str, str], redis: FakeRedis) -> List[Scenario]:
+    def request(method: str, path: str, **kwargs) -> Callable[[httpx.AsyncClient], Awaitable[int]]:
+        async def call(client: httpx.AsyncClient) -> int:
+            return (await client.request(method, path, **kwargs)).status_code
+        return call
+
+    def chat(size: str) -> Callable[[httpx.AsyncClient], Awaitable[int]]:
+        body = {"project_id": "bench", "document_url": fixtures.url(f"{size}.html"), "question": "What does the report cover?"}
+        return request("POST", "/api/v1/chat/message", json=body)
+
+    def forget_chunks(size: str) -> Callable[[], None]:
+        key = f"doc_chunks:{fixtures.url(f'{size}.html')}"
+        return lambda: redis._data.pop(key, None)
+
+    async def team_members(client: httpx.AsyncClient) -> int:
+        from mugeshbabu_agents.domain.teams.service import team_service
+        await team_service.get_team_agents(ids["large_team"])
+        return 200
+
+    scenarios = [
+        Scenario("health", request("GET", "/health")),
+        # Authenticated, handled without any I/O (invalid job id)
+        Scenario("auth", request("GET", "/api/v1/documents/pdf/jobs/bench"), expected_status=404),
+        Scenario(
+            "auth_invalid_token",
+            request("GET", "/api/v1/documents/pdf/jobs/bench", headers={"Authorization": "Bearer not-a-jwt"}),
+            expected_status=401,
+        ),
+        Scenario("chat_warm_small", chat("small")),
+    ]
+    scenarios += [Scenario(f"chat_cold_{size}", chat(size), before=forget_chunks(size)) for size in DOCUMENT_SIZES]
+    scenarios += [
+        Scenario(
+            "execute_agent",
+            request("POST", f"/api/v1/agents/execute/{ids['agent']}", params={"project_id": "bench"}, json={"input_data": {"q": "hi"}}),
+        ),
+        Scenario("team_members", team_members),
+        Scenario("team_agents_page", request("GET", f"/api/v1/teams/{ids['large_team']}/agents", params={"limit": 100})),
+        Scenario("team_execute", request("POST", f"/api/v1/teams/{ids['small_team']}/execute", params={"project_id": "bench"}, json={})),
+    ]
+    return scenarios
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, alloc_requests: int) -> Dict[str, Any]:
+    errors = 0
+
+    async def one() -> float:
+        nonlocal errors
+        if scenario.before:
+            scenario.before()
+        start = time.perf_counter()
+        status = await scenario.call(client)
+        elapsed = (time.perf_counter() - start) * 1000
+        if status != scenario.expected_status:
+            errors += 1
+        return elapsed
+
+    for _ in range(min(20, requests)):
+        await one()
+    errors = 0
+
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            latencies.append(await one())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    # Allocations, measured sequentially so requests don't overlap
+    peaks, retained = [], 0
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_requests):
+            if scenario.before:
+                scenario.before()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await scenario.call(client)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained += current - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "alloc": {
+            "peak_kib_per_request": round(statistics.fmean(peaks) / 1024, 1) if peaks else None,
+            "retained_bytes_per_request": round(retained / alloc_requests) if alloc_requests else None,
+        },
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results: Dict[str, Any], baseline: Dict[str, Any]):
+    print(f"\nCompared with {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')}):")
+    for name, result in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        rps = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100
+        p95 = (result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100
+        print(f"  {name:<20} throughput {rps:+6.1f}%   p95 {p95:+6.1f}%")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--alloc-requests", type=int, default=50, help="Requests per scenario measured with tracemalloc")
+    parser.add_argument("--agents", type=int, default=2000, help="Agents seeded in the store")
+    parser.add_argument("--only", help="Comma-separated scenario names")
+    parser.add_argument("--admission", action="store_true", help="Keep adaptive admission control enabled")
+    parser.add_argument("--json", default="bench_app.json", help="Where to write the results")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    from mugeshbabu_agents.core.config import settings
+    settings.mongo.ensure_indexes = False
+    settings.admission.enabled = args.admission
+    # The limiter still runs (against the fake Redis), it just never rejects
+    for route in ("execute", "chat", "pdf"):
+        setattr(settings.rate_limit, route, "1000000/second")
+    from mugeshbabu_agents.main import app
+    # Log records are still created (that is part of the cost), just not written out
+    root = logging.getLogger()
+    root.setLevel(logging.WARNING)
+    root.handlers = [logging.NullHandler()]
+
+    standins = install_standins(settings)
+    ids = seed(standins["db"], args.agents)
+    fixtures = FixtureServer({f"{name}.html": html_document(size) for name, size in DOCUMENT_SIZES.items()})
+
+    scenarios = build_scenarios(fixtures, ids, standins["redis"])
+    if args.only:
+        wanted = set(args.only.split(","))
+        scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+
+    token = jwt.encode(
+        {"sub": "bench-user", "email": "bench@example.com", "exp": datetime.utcnow() + timedelta(hours=1)},
+        settings.auth.jwt_secret,
+        algorithm=settings.auth.jwt_algorithm,
+    )
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}) as client:
+            for scenario in scenarios:
+                result = await run_scenario(client, scenario, args.requests, args.concurrency, args.alloc_requests)
+                results[scenario.name] = result
+                latency = result["latency_ms"]
+                print(
+                    f"{scenario.name:<20} {result['throughput_rps']:9.1f} req/s  "
+                    f"p50={latency['p50']:8.2f}ms p95={latency['p95']:8.2f}ms p99={latency['p99']:8.2f}ms  "
+                    f"peak={result['alloc']['peak_kib_per_request']}KiB  errors={result['errors']}"
+                )
+    finally:
+        fixtures.close()
+
+    output = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+            "queue_messages": standins["queue"].sent,
+        },
+        "scenarios": results,
+    }
+    with open(args.json, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+if __name__ == "__main__":
+    asyncio.run(main())
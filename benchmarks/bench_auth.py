@@ -0,0 +1,96 @@
+"""
+Per-request overhead of the auth middleware.
+
+Runs a minimal app in-process (no network) behind:
+  * no middleware (baseline),
+  * the previous BaseHTTPMiddleware implementation (kept here for comparison),
+  * the current pure ASGI AuthMiddleware,
+and reports the mean added latency per authenticated request.
+
+    uv run python benchmarks/bench_auth.py [--requests 5000]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import jwt
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.middleware import AuthMiddleware
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation AuthMiddleware replaced."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.public_paths = ["/health", "/docs", "/openapi.json", "/redoc", "/api/v1/auth"]
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(p) for p in self.public_paths):
+            return await call_next(request)
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Missing Authorization header"})
+        scheme, token = auth_header.split()
+        try:
+            request.state.user = jwt.decode(token, settings.auth.jwt_secret, algorithms=[settings.auth.jwt_algorithm])
+        except jwt.PyJWTError:
+            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Could not validate credentials"})
+        return await call_next(request)
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    if middleware:
+        app.add_middleware(middleware)
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(100):
+                yield b"x" * 1024
+        return StreamingResponse(chunks())
+
+    return app
+
+async def run(app: FastAPI, path: str, token: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100): # warm-up
+            await client.get(path, headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            resp = await client.get(path, headers=headers)
+            assert resp.status_code == 200, resp.text
+        return (time.perf_counter() - start) / requests
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = jwt.encode(
+        {"sub": "bench", "email": "bench@example.com", "exp": datetime.utcnow() + timedelta(hours=1)},
+        settings.auth.jwt_secret,
+        algorithm=settings.auth.jwt_algorithm
+    )
+
+    for path in ("/api/v1/ping", "/api/v1/stream"):
+        print(f"{path} ({args.requests} requests)")
+        baseline = await run(build_app(None), path, token, args.requests)
+        print(f"  {'no middleware':<24} {baseline * 1e6:8.1f} us/request")
+        for label, middleware in (("BaseHTTPMiddleware", LegacyAuthMiddleware), ("pure ASGI", AuthMiddleware)):
+            per_request = await run(build_app(middleware), path, token, args.requests)
+            print(f"  {label:<24} {per_request * 1e6:8.1f} us/request (+{(per_request - baseline) * 1e6:.1f} us)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+Per-document decode cost of BaseRepository read paths.
+
+Compares full validation (`Model(**doc)`, the default `get`/`list` path), the trusted
+path (`model_construct`) and raw projected dicts on documents shaped like the ones
+stored in MongoDB.
+
+    uv run python benchmarks/bench_decode.py [--docs 10000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from mugeshbabu_agents.domain.agents.models import Agent
+from mugeshbabu_agents.domain.chat.models import Conversation
+
+def agent_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"Agent {i}",
+        "description": "Answers questions about SAP modules",
+        "system_prompt": "You are a helpful assistant. " * 20,
+        "mcp_servers": [{"server_name": "github", "server_url": None, "auth_config": {"type": "oauth"}}],
+        "category": "SAP",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+def conversation_doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "project_id": "default-project",
+        "document_url": f"https://example.com/docs/{i}",
+        "messages": [
+            {"role": "user" if m % 2 == 0 else "assistant", "content": "Lorem ipsum " * 30, "timestamp": datetime.utcnow()}
+            for m in range(10)
+        ],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+def measure(label: str, fn, docs: list, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best / len(docs) * 1e6:8.2f} us/doc")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for model_cls, make_doc in ((Agent, agent_doc), (Conversation, conversation_doc)):
+        docs = [make_doc(i) for i in range(args.docs)]
+        print(f"{model_cls.__name__} ({args.docs} docs, best of {args.repeat})")
+        validated = measure("validated Model(**doc)", lambda d: model_cls(**d), docs, args.repeat)
+        trusted = measure("trusted model_construct", lambda d: model_cls.model_construct(**d), docs, args.repeat)
+        measure("raw dict (projection)", lambda d: d, docs, args.repeat)
+        print(f"  trusted speedup: {validated / trusted:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+PDF render throughput through the browser context pool.
+
+Serves the HTML fixtures in `benchmarks/fixtures` from a local HTTP server and renders
+them with `PDFService.generate_pdf` at the requested concurrency, then prints
+throughput, latency percentiles and pool stats. Requires a Playwright Chromium
+install (`uv run playwright install chromium`).
+
+    uv run python benchmarks/bench_pdf.py [--renders 200] [--concurrency 16] [--pool-size 4]
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(FIXTURES)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-renders", type=int, default=50, help="Renders before a context is recycled")
+    args = parser.parse_args()
+
+    # Configure the pool before the service singleton is built
+    from mugeshbabu_agents.core.config import settings
+    settings.pdf.pool_size = args.pool_size
+    settings.pdf.max_renders_per_context = args.max_renders
+    settings.pdf.max_waiters = args.renders
+    settings.pdf.acquire_timeout = 300
+    settings.pdf.cache_enabled = False
+    from mugeshbabu_agents.domain.documents.pdf_service import PDFService
+
+    service = PDFService()
+    # Measure rendering only, not the mock storage
+    async def no_storage(file_bytes: bytes, key: str):
+        pass
+    service._process_storage = no_storage
+
+    server = serve_fixtures()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/{path.name}" for path in sorted(FIXTURES.glob("*.html"))]
+
+    await service.pool.start(warm=True)
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.renders):
+        queue.put_nowait(urls[i % len(urls)])
+
+    async def worker():
+        while not queue.empty():
+            url = queue.get_nowait()
+            start = time.perf_counter()
+            await service.generate_pdf(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        stats = service.stats()
+    finally:
+        await service.close()
+        server.shutdown()
+
+    print(f"{args.renders} renders, concurrency={args.concurrency}, pool_size={args.pool_size}")
+    print(f"  throughput   {args.renders / elapsed:7.2f} renders/s")
+    print(
+        f"  latency      p50={statistics.median(latencies):7.1f}ms "
+        f"p95={percentile(latencies, 0.95):7.1f}ms p99={percentile(latencies, 0.99):7.1f}ms"
+    )
+    print(f"  pool         {stats}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Memory use of relaying a large direct-PDF download.
+
+Serves a generated file with `Content-Type: application/pdf` from a local HTTP server
+and pulls it through `PDFService.generate_pdf(url, stream=True)` the way the /pdf
+endpoint does, then reports throughput and the peak Python heap (tracemalloc).
+The peak should stay near a few chunk sizes regardless of `--size-mb`.
+
+    uv run python benchmarks/bench_pdf_stream.py [--size-mb 500]
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHUNK = b"%PDF-1.4\n" + b"0" * (1024 * 1024 - 9)
+
+def serve_pdf(size_mb: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def _headers(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(size_mb * len(CHUNK)))
+            self.end_headers()
+
+        def do_HEAD(self):
+            self._headers()
+
+        def do_GET(self):
+            self._headers()
+            for _ in range(size_mb):
+                self.wfile.write(CHUNK)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    from mugeshbabu_agents.core.config import settings
+    settings.pdf.cache_enabled = False
+    settings.artifacts.directory = tempfile.mkdtemp(prefix="bench-artifacts-")
+    settings.artifacts.max_bytes = (args.size_mb + 1) * 1024 ** 2
+    from mugeshbabu_agents.domain.documents.pdf_service import PDFService
+    from mugeshbabu_agents.infrastructure.http_client import http_client
+
+    server = serve_pdf(args.size_mb)
+    service = PDFService()
+    url = f"http://127.0.0.1:{server.server_address[1]}/large.pdf"
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    relayed = 0
+    try:
+        stream = await service.generate_pdf(url, stream=True)
+        async for chunk in stream.chunks:
+            relayed += len(chunk)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await http_client.close()
+        server.shutdown()
+
+    print(f"Relayed {relayed / 1024 ** 2:.0f} MB in {elapsed:.2f}s ({relayed / 1024 ** 2 / elapsed:.1f} MB/s)")
+    print(f"  peak heap    {peak / 1024 ** 2:.2f} MB")
+    print(f"  artifact     {stream.artifact.path}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
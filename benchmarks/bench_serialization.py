@@ -0,0 +1,127 @@
+"""
+Serialization cost of realistic payloads, per JSON backend.
+
+Compares the stdlib and orjson backends of `core.serialization` (plus, for the
+team agents page, FastAPI's `response_model` path: validate the page model and
+dump it with pydantic-core) on:
+
+- team_agents_page: a 100-agent `/teams/{id}/agents` page of raw documents
+- chunk_cache: the chat chunk list cached in Redis for a ~1 MiB document
+- pdf_cache_entry: a PDF cache entry (small Redis payload)
+- ndjson_export: 1000 agent documents encoded one per line
+- error: an error response body
+
+Reports microseconds per operation (best of `--repeat` rounds) and output size.
+
+    uv run python benchmarks/bench_serialization.py [--number 200] [--repeat 5]
+"""
+import argparse
+import json
+import timeit
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from bson import ObjectId
+
+from mugeshbabu_agents.core import serialization
+from mugeshbabu_agents.core.config import settings
+
+def agent_documents(count: int) -> List[Dict[str, Any]]:
+    """Agent documents as stored in Mongo (ObjectIds, datetimes)."""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Agent {i}",
+            "description": "Summarizes quarterly finance reports for the regional sales team.",
+            "system_prompt": "You are a careful financial analyst. Answer with citations. " * 8,
+            "mcp_servers": [{"name": "search", "url": "https://mcp.example.com/search", "headers": {"x-team": "finance"}}],
+            "category": "finance",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+def chunks(size: int) -> List[str]:
+    words = "The quarterly report covers revenue, margins and the outlook for the next fiscal year".split()
+    text = " ".join(words[i % len(words)] for i in range(size // 6))
+    from mugeshbabu_agents.domain.chat.service import chat_service
+    return chat_service._chunk_text(text)
+
+def backends() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[Any], Any]]]:
+    """Every backend available here, built the same way the app selects one."""
+    found = {}
+    original = settings.app.json_backend
+    try:
+        for name in ("json", "orjson"):
+            settings.app.json_backend = name
+            try:
+                backend, dumps, loads = serialization._select_backend()
+            except RuntimeError:
+                continue
+            found[backend] = (dumps, loads)
+    finally:
+        settings.app.json_backend = original
+    return found
+
+def measure(fn: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200, help="Operations per round")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from pydantic import TypeAdapter
+    from mugeshbabu_agents.domain.documents.pdf_cache import CacheEntry
+    from mugeshbabu_agents.domain.teams.models import TeamAgentPage
+
+    page_docs = agent_documents(100)
+    export_docs = agent_documents(1000)
+    chunk_list = chunks(1024 * 1024)
+    entry = asdict(CacheEntry(digest="a" * 64, size=183_211, created_at=1760000000.0, etag='"5f1b0db"', last_modified=None))
+    error = {"error": "HTTP Error", "message": "Team 6ad55e21e68fb4d88d3edb5b not found"}
+
+    rows: List[Tuple[str, str, float, int]] = []
+
+    def run(payload: str, variant: str, fn: Callable[[], Any]):
+        output = fn()
+        rows.append((payload, variant, measure(fn, args.number, args.repeat), len(output) if output is not None else 0))
+
+    # FastAPI's response_model path, as the route worked before: ids stringified,
+    # the page validated, then dumped to JSON by pydantic-core
+    adapter = TypeAdapter(TeamAgentPage)
+
+    def response_model_path() -> bytes:
+        docs = [{**doc, "_id": str(doc["_id"])} for doc in page_docs]
+        return adapter.dump_json(adapter.validate_python(TeamAgentPage(items=docs, next_cursor="abc")), by_alias=True)
+
+    run("team_agents_page", "response_model", response_model_path)
+
+    for name, (dumps, loads) in backends().items():
+        run("team_agents_page", name, lambda: dumps({"items": page_docs, "next_cursor": "abc"}))
+
+        encoded_chunks = dumps(chunk_list).decode()
+        run("chunk_cache", f"{name} encode", lambda: dumps(chunk_list))
+        run("chunk_cache", f"{name} decode", lambda: loads(encoded_chunks) and None)
+
+        encoded_entry = dumps(entry).decode()
+        run("pdf_cache_entry", f"{name} encode", lambda: dumps(entry))
+        run("pdf_cache_entry", f"{name} decode", lambda: loads(encoded_entry) and None)
+
+        run("ndjson_export", name, lambda: b"".join(dumps(doc) + b"\n" for doc in export_docs))
+        run("error", name, lambda: dumps(error))
+
+    # What the export did before
+    run("ndjson_export", "json default=str", lambda: "".join(json.dumps(doc, default=str) + "\n" for doc in export_docs).encode())
+
+    print(f"Default backend here: {serialization.BACKEND}\n")
+    print(f"{'payload':<18} {'variant':<20} {'us/op':>10} {'bytes':>10}")
+    for payload, variant, micros, size in rows:
+        print(f"{payload:<18} {variant:<20} {micros:10.1f} {size:10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Startup budget: how long `import mugeshbabu_agents.main` takes, and what it pulls in.
+
+Imports the app in fresh interpreters with `-X importtime` (best of `--runs`, so
+a cold disk cache on the first run doesn't count), prints the slowest modules by
+cumulative time and fails (exit code 1) when:
+
+- the import takes longer than `--budget-ms`, or
+- a dependency that should only load on first use (Playwright, BeautifulSoup,
+  rank_bm25/numpy, passlib/argon2, pypdf) was imported.
+
+    uv run python benchmarks/check_import_time.py [--budget-ms 1500] [--runs 5] [--top 20]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+TARGET = "mugeshbabu_agents.main"
+
+# Imported lazily where they're used; importing them at startup is a regression
+LAZY_MODULES = ("playwright", "bs4", "rank_bm25", "numpy", "passlib", "argon2", "pypdf")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+CHECK_LAZY = f"import sys, {TARGET}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+
+def measure() -> Tuple[int, Dict[str, int]]:
+    """Import the app once; returns (total microseconds, cumulative microseconds per top-level package)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"], capture_output=True, text=True, check=True
+    )
+    total = 0
+    packages: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, _, module = match.groups()
+        if module == TARGET:
+            total = int(cumulative)
+        # Each module is listed once, when first imported; a package's own line includes its submodules
+        elif "." not in module:
+            packages[module] = int(cumulative)
+    return total, packages
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="Slowest top-level packages to print")
+    args = parser.parse_args()
+
+    best_total, best_packages = None, {}
+    for _ in range(args.runs):
+        total, packages = measure()
+        if best_total is None or total < best_total:
+            best_total, best_packages = total, packages
+
+    print(f"Slowest top-level packages (cumulative, overlapping; best of {args.runs} runs):")
+    for package, micros in sorted(best_packages.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {package:<32} {micros / 1000:8.1f}ms")
+    total_ms = best_total / 1000
+    print(f"\nimport {TARGET}: {total_ms:.1f}ms (budget {args.budget_ms:g}ms)")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time is over budget by {total_ms - args.budget_ms:.1f}ms")
+        failed = True
+
+    loaded = subprocess.run([sys.executable, "-c", CHECK_LAZY], capture_output=True, text=True, check=True).stdout.strip()
+    if loaded:
+        print(f"FAIL: imported at startup, should be lazy: {loaded}")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Startup and readiness against the local stand-ins (see `standins.py`).
+
+Runs `ResourceManager.startup()` with the in-memory Mongo and Redis, then a
+readiness probe, and fails (exit code 1) unless:
+
+- every warm-up step (mongo, redis, http) succeeded,
+- the declared master indexes were created, and
+- the instance reports ready.
+
+    uv run python benchmarks/check_lifecycle.py
+"""
+import asyncio
+import logging
+import sys
+from typing import List
+
+from bench_app import install_standins
+
+async def check() -> List[str]:
+    from mugeshbabu_agents.core.config import settings
+    from mugeshbabu_agents.core.lifecycle import resource_manager
+    from mugeshbabu_agents.infrastructure.db import db_manager
+    from mugeshbabu_agents.infrastructure.indexes import MASTER, index_registry
+
+    settings.lifecycle.prelaunch_browser = False
+    settings.mongo.ensure_indexes = True
+    standins = install_standins(settings)
+
+    async def connect():
+        pass # Already pointed at the stand-in
+
+    db_manager.connect = connect
+
+    failures = []
+    await resource_manager.startup()
+    try:
+        for name, check in resource_manager.checks.items():
+            print(f"{name:<8} ok={check.ok} {check.latency_ms}ms{f' ({check.error})' if check.error else ''}")
+            if not check.ok:
+                failures.append(f"{name} is down after startup: {check.error}")
+
+        for collection, specs in index_registry.for_scope(MASTER).items():
+            created = standins["db"][collection].indexes
+            missing = [spec.index_name for spec in specs if spec.index_name not in created]
+            if missing:
+                failures.append(f"indexes not created on {collection}: {', '.join(missing)}")
+
+        resource_manager._checked_at = 0 # Make the probe re-ping
+        ready, body = await resource_manager.readiness()
+        print(f"ready={ready} state={body['state']}")
+        if not ready:
+            failures.append(f"not ready: {body}")
+    finally:
+        await resource_manager.shutdown()
+    return failures
+
+def main() -> int:
+    logging.basicConfig(level=logging.WARNING)
+    failures = asyncio.run(check())
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Render every HTML fixture with every render profile and check the output.
+
+Fixtures in `benchmarks/fixtures` are served from a local HTTP server that also
+answers `/slow` after `--slow-seconds` (a stand-in for analytics long-polling, used
+by `beacon.html`). An extra "bench" profile blocks requests to `localhost`, which
+is where the beacon points. For each render the script checks that the output is a
+PDF with at least one page, and prints the navigate/ready/pdf stage timings.
+`delayed-diagram.html` must spend at least 300ms in the ready stage (its diagram
+appears late); `beacon.html` should only be slow with the "full" profile.
+Requires a Playwright Chromium install.
+
+    uv run python benchmarks/check_profiles.py [--profile default --profile full]
+"""
+import argparse
+import asyncio
+import functools
+import re
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+def serve_fixtures(slow_seconds: float) -> ThreadingHTTPServer:
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/slow":
+                time.sleep(slow_seconds)
+                self.send_response(204)
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                return
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(FIXTURES)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def page_count(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type\s*/Page[^s]", pdf))
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="append", help="Profiles to check (default: all)")
+    parser.add_argument("--slow-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from mugeshbabu_agents.core.config import RenderProfile, settings
+    settings.pdf.cache_enabled = False
+    settings.pdf.render_workers = 0
+    settings.pdf.profiles["bench"] = RenderProfile(blocked_domains=["localhost"])
+    from mugeshbabu_agents.domain.documents.pdf_service import PDFService
+    from mugeshbabu_agents.infrastructure.http_client import http_client
+
+    service = PDFService()
+    async def no_storage(file_bytes: bytes, key: str):
+        pass
+    service._process_storage = no_storage
+
+    server = serve_fixtures(args.slow_seconds)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    profiles = args.profile or list(settings.pdf.profiles)
+    failures = 0
+
+    try:
+        for profile in profiles:
+            print(f"profile={profile}")
+            for fixture in sorted(FIXTURES.glob("*.html")):
+                start = time.perf_counter()
+                artifact = await service.generate_pdf(f"{base}/{fixture.name}", profile=profile)
+                elapsed = (time.perf_counter() - start) * 1000
+                pdf = await artifact.read()
+                timings = " ".join(f"{stage}={ms:7.1f}ms" for stage, ms in artifact.timings.items())
+
+                problems = []
+                if not pdf.startswith(b"%PDF") or page_count(pdf) < 1:
+                    problems.append("not a PDF with pages")
+                if fixture.name == "delayed-diagram.html" and artifact.timings.get("ready", 0) < 300:
+                    problems.append("printed before the diagram rendered")
+                failures += bool(problems)
+                status = "FAIL " + ", ".join(problems) if problems else "ok"
+                print(f"  {fixture.name:<22} {elapsed:8.1f}ms  {timings}  {status}")
+    finally:
+        await service.close()
+        await http_client.close()
+        server.shutdown()
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
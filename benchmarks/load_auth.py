@@ -0,0 +1,78 @@
+"""
+Login burst load test.
+
+Measures latency of a non-auth endpoint (`/health` by default) on its own, then
+again while a burst of concurrent logins is running, against a live server:
+
+    uv run uvicorn mugeshbabu_agents.main:app --port 8000
+    uv run python benchmarks/load_auth.py --email user@example.com --password secret
+
+With hashing offloaded to its worker pool, p95/p99 of the probe endpoint should
+stay close to the idle numbers; logins beyond the queue limit get a 503.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+async def probe(client: httpx.AsyncClient, path: str, duration: float, interval: float) -> list[float]:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        resp = await client.get(path)
+        resp.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+async def login_burst(client: httpx.AsyncClient, email: str, password: str, concurrency: int, duration: float) -> Counter:
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            resp = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+            statuses[resp.status_code] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses
+
+def report(label: str, samples: list[float]):
+    print(
+        f"  {label:<14} n={len(samples):<5} p50={statistics.median(samples):7.2f}ms "
+        f"p95={percentile(samples, 0.95):7.2f}ms p99={percentile(samples, 0.99):7.2f}ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        print(f"{args.probe_path} latency ({args.duration:.0f}s each)")
+        idle = await probe(client, args.probe_path, args.duration, 0.01)
+        report("idle", idle)
+
+        burst = asyncio.create_task(login_burst(client, args.email, args.password, args.concurrency, args.duration))
+        loaded = await probe(client, args.probe_path, args.duration, 0.01)
+        statuses = await burst
+        report("login burst", loaded)
+
+    print(f"Login responses: {dict(statuses)}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,403 @@
+"""
+Local stand-ins for the service's external dependencies, used by `bench_app.py`.
+
+  * FakeMongoClient: an in-memory store with the subset of the Motor API the
+    repositories use (filters with $in/$or/$and/comparisons, $set/$push/$inc/
+    $setOnInsert updates, sort/skip/limit cursors, create_indexes and ping). Like a
+    standalone server, it has no change streams. Documents are deep-copied in and
+    out, as a BSON round trip would.
+  * FakeRedis: ping/get/set/setex plus the rate limiter's Lua script, in memory.
+  * FixtureServer: serves generated HTML documents of various sizes over HTTP.
+  * FakeQueue: records the SQS messages AgentService would send.
+
+Driver, network and server-side costs are not modelled: the numbers measure this
+service's own overhead.
+"""
+import asyncio
+import copy
+import functools
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+# Mongo
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if op == "$eq":
+        return value == operand or (isinstance(value, list) and operand in value)
+    if op == "$ne":
+        return not _compare(value, "$eq", operand)
+    if op == "$in":
+        return any(_compare(value, "$eq", item) for item in operand)
+    if op == "$nin":
+        return not _compare(value, "$in", operand)
+    if op == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise NotImplementedError(f"Unsupported query operator {op}")
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            value = _get(doc, key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif not _compare(_get(doc, key), "$eq", condition):
+            return False
+    return True
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    if any(projection.values()):
+        fields = [field for field, include in projection.items() if include]
+        result = {field: copy.deepcopy(doc[field]) for field in fields if field in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k not in projection}
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool):
+    for op, fields in update.items():
+        for field, value in fields.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                doc[field] = copy.deepcopy(value)
+            elif op == "$inc":
+                doc[field] = doc.get(field, 0) + value
+            elif op == "$push":
+                items = doc.setdefault(field, [])
+                items.extend(copy.deepcopy(value["$each"]) if isinstance(value, dict) and "$each" in value else [copy.deepcopy(value)])
+                if isinstance(value, dict) and "$slice" in value:
+                    limit = value["$slice"]
+                    doc[field] = items[limit:] if limit < 0 else items[:limit]
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"Unsupported update operator {op}")
+
+def _sort_key(value: Any):
+    # Missing values sort first, like MongoDB's null ordering
+    return (value is not None, value if value is not None else 0)
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]], projection: Optional[Dict[str, Any]]):
+        self._docs = docs
+        self._projection = projection
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1) -> "FakeCursor":
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda doc: _sort_key(_get(doc, field)), reverse=order < 0)
+        return self
+
+    def skip(self, count: int) -> "FakeCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        self._limit = count
+        return self
+
+    def _selected(self) -> Iterable[Dict[str, Any]]:
+        docs = self._docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return (_project(doc, self._projection) for doc in docs)
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = list(self._selected())
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._selected():
+            yield doc
+
+class FakeCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Any]] = {} # name -> key, from create_indexes
+
+    def _find(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Lookups by _id use the "index" instead of a scan, like the real server
+        _id = (query or {}).get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            candidates = [self.docs.get(_id)]
+        elif isinstance(_id, dict) and "$in" in _id:
+            candidates = [self.docs.get(i) for i in dict.fromkeys(_id["$in"])]
+        else:
+            candidates = self.docs.values()
+        return [doc for doc in candidates if doc is not None and matches(doc, query)]
+
+    async def insert_one(self, document: Dict[str, Any]):
+        document.setdefault("_id", ObjectId())
+        self.docs[document["_id"]] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        ids = [(await self.insert_one(document)).inserted_id for document in documents]
+        return SimpleNamespace(inserted_ids=ids)
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        found = self._find(query)
+        return _project(found[0], projection) if found else None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs) -> FakeCursor:
+        return FakeCursor(self._find(query), projection)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None, **kwargs):
+        found = self._find(query)
+        if found:
+            doc = found[0]
+            _apply_update(doc, update, inserting=False)
+        elif upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$")}
+            doc.setdefault("_id", ObjectId())
+            _apply_update(doc, update, inserting=True)
+            self.docs[doc["_id"]] = doc
+        else:
+            return None
+        return _project(doc, projection)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one_and_update(query, update, upsert=upsert)
+        return SimpleNamespace(matched_count=int(doc is not None), modified_count=int(doc is not None))
+
+    async def update_many(self, query, update, upsert=False):
+        found = self._find(query)
+        for doc in found:
+            _apply_update(doc, update, inserting=False)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def replace_one(self, query, replacement, upsert=False):
+        found = self._find(query)
+        if not found and not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0)
+        doc = copy.deepcopy(replacement)
+        doc.setdefault("_id", found[0]["_id"] if found else query.get("_id", ObjectId()))
+        if not found and doc["_id"] in self.docs:
+            # The upsert's insert collides with a document the filter didn't match
+            raise DuplicateKeyError(f"E11000 duplicate key error, _id: {doc['_id']}")
+        self.docs[doc["_id"]] = doc
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def delete_one(self, query):
+        found = self._find(query)
+        if found:
+            del self.docs[found[0]["_id"]]
+        return SimpleNamespace(deleted_count=len(found[:1]))
+
+    async def count_documents(self, query):
+        return len(self._find(query))
+
+    async def create_indexes(self, indexes: List[Any]) -> List[str]:
+        for index in indexes:
+            self.indexes[index.document["name"]] = dict(index.document["key"])
+        return list(self.indexes)
+
+    def watch(self, *args, **kwargs):
+        # Like a standalone server: no change streams
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+class FakeDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+class FakeMongoClient:
+    def __init__(self):
+        self._databases: Dict[str, FakeDatabase] = {}
+        self.admin = SimpleNamespace(command=self._command)
+
+    async def _command(self, name: str, *args, **kwargs) -> Dict[str, Any]:
+        if name != "ping":
+            raise NotImplementedError(f"Unsupported command {name}")
+        return {"ok": 1.0}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(name)
+        return self._databases[name]
+
+    def get_database(self, name: str, **kwargs) -> FakeDatabase:
+        return self[name]
+
+    async def list_database_names(self) -> List[str]:
+        return list(self._databases)
+
+    def close(self):
+        pass
+
+# Redis
+
+class FakeRedis:
+    """The Redis commands the service uses, in memory (values are strings)."""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+
+    def _live(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data[key] if self._live(key) else None
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None):
+        self._data[key] = str(value) if not isinstance(value, (str, bytes)) else value
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def setex(self, key: str, seconds: int, value: Any):
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys: str) -> int:
+        removed = sum(1 for key in keys if self._live(key))
+        for key in keys:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    def flushall(self):
+        self._data.clear()
+        self._expires.clear()
+
+    def register_script(self, script: str):
+        """Only the rate limiter's sliding window script is supported."""
+        async def sliding_window(keys: List[str], args: List[Any]):
+            limit, window, now, pending, cost = (int(arg) for arg in args)
+            current = int(await self.get(keys[0]) or 0)
+            previous = int(await self.get(keys[1]) or 0)
+            weight = (window - now % window) / window
+            if pending > 0:
+                current += pending
+                await self.set(keys[0], current, ex=math.ceil(window * 2 / 1000))
+            estimated = previous * weight + current
+            if estimated + cost > limit:
+                return [0, math.ceil(estimated)]
+            current += cost
+            await self.set(keys[0], current, ex=math.ceil(window * 2 / 1000))
+            return [1, math.ceil(previous * weight + current)]
+        return sliding_window
+
+    async def aclose(self):
+        pass
+
+# HTTP fixtures
+
+PARAGRAPH = (
+    "<p>The quarterly report covers revenue, churn and the onboarding funnel. Agents "
+    "summarise each section and answer follow-up questions about the figures.</p>\n"
+)
+
+def html_document(size: int) -> bytes:
+    """An HTML page of about `size` bytes, with scripts and styles the parser strips."""
+    head = "<html><head><style>p { color: #333; }</style><script>var x = 1;</script></head><body>\n"
+    body = PARAGRAPH * max(1, (size - len(head)) // len(PARAGRAPH))
+    return (head + body + "</body></html>").encode()
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, documents: Dict[str, bytes], *args, **kwargs):
+        self.documents = documents
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        body = self.documents.get(self.path.lstrip("/"))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer:
+    """Serves `{name: bytes}` documents on 127.0.0.1 from a background thread."""
+
+    def __init__(self, documents: Dict[str, bytes]):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_FixtureHandler, documents))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+# Queue
+
+class FakeQueue:
+    """Collects the messages AgentService pushes to SQS, without the mock's sleep."""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def push(self, message: Dict[str, Any]):
+        self.sent += 1
+        await asyncio.sleep(0)
+
+    async def push_batch(self, messages: List[Dict[str, Any]]) -> List[str]:
+        self.sent += len(messages)
+        await asyncio.sleep(0)
+        return []
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Response
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.metrics import CONTENT_TYPE, metrics
+from mugeshbabu_agents.core.admission import admission_controller
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.redis_client import redis_manager
+from mugeshbabu_agents.infrastructure.http_client import http_client
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+from mugeshbabu_agents.domain.documents.pdf_service import pdf_service
+from mugeshbabu_agents.domain.documents.render_farm import render_farm
+
+POOL_CONNECTIONS = metrics.gauge(
+    "pool_connections", "Connections (browser contexts for pdf_browser) per pool and state", ("pool", "state")
+)
+POOL_SIZE = metrics.gauge("pool_size", "Configured maximum size of each pool", ("pool",))
+POOL_WAITING = metrics.gauge("pool_waiting", "Callers waiting for a pool slot", ("pool",))
+ADMISSION_LIMIT = metrics.gauge("admission_limit", "Current adaptive concurrency limit", ("group",))
+ADMISSION_IN_FLIGHT = metrics.gauge("admission_in_flight", "Requests in flight", ("group",))
+ARTIFACT_STORE_BYTES = metrics.gauge("artifact_store_bytes", "Bytes used by the local artifact store")
+
+def _set_pool(pool: str, in_use: int, idle: int, size=None, waiting=None):
+    POOL_CONNECTIONS.set(in_use, pool, "in_use")
+    POOL_CONNECTIONS.set(idle, pool, "idle")
+    if size is not None:
+        POOL_SIZE.set(size, pool)
+    if waiting is not None:
+        POOL_WAITING.set(waiting, pool)
+
+@metrics.collector
+def collect_pools():
+    """Pool usage of Mongo, Redis, the HTTP client, the browser pool and render workers."""
+    POOL_CONNECTIONS.clear()
+    for cluster, stats in db_manager.pool_stats()["clusters"].items():
+        _set_pool(
+            f"mongo:{cluster}", stats["checked_out"], stats["open_connections"] - stats["checked_out"], stats["max_pool_size"]
+        )
+
+    redis_stats = redis_manager.pool_stats()
+    _set_pool("redis", redis_stats["in_use"], redis_stats["available"], redis_stats["max_connections"])
+
+    http_stats = http_client.pool_stats()
+    _set_pool("http", http_stats["active"], http_stats["idle"], http_stats["max_connections"])
+
+    browser = pdf_service.stats()
+    _set_pool("pdf_browser", browser["in_use"], browser["idle"], browser["size"], browser["waiting"])
+
+    if render_farm.workers:
+        farm = render_farm.stats()
+        busy = min(farm["pending"], farm["workers"])
+        _set_pool("pdf_workers", busy, farm["workers"] - busy, farm["workers"], farm["pending"] - busy)
+
+@metrics.collector
+def collect_admission():
+    for group, stats in admission_controller.stats().items():
+        ADMISSION_LIMIT.set(stats["limit"], group)
+        ADMISSION_IN_FLIGHT.set(stats["in_flight"], group)
+
+@metrics.collector
+def collect_artifacts():
+    ARTIFACT_STORE_BYTES.set(artifact_store.stats()["bytes"])
+
+router = APIRouter()
+
+@router.get(settings.metrics.path, include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text format scrape endpoint."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.core.admission import admission_controller
+from mugeshbabu_agents.core.profiling import ProfileCaptureRequest, profiler
+from mugeshbabu_agents.domain.documents.pdf_service import pdf_service
+from mugeshbabu_agents.domain.documents.pdf_cache import pdf_cache
+from mugeshbabu_agents.domain.documents.render_farm import render_farm
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+
+async def require_admin(request: Request):
+    """Allow only users listed in `settings.auth.admin_emails`."""
+    user = getattr(request.state, "user", None) or {}
+    if user.get("email") not in settings.auth.admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/indexes")
+async def index_report() -> List[Dict[str, Any]]:
+    """List declared indexes that are missing and existing indexes that are unused."""
+    return await db_manager.index_report()
+
+@router.post("/indexes/ensure")
+async def ensure_indexes():
+    """Create declared indexes on the master DB and every project DB."""
+    await db_manager.ensure_indexes()
+    return {"status": "ok"}
+
+@router.get("/db/pools")
+async def db_pool_stats() -> Dict[str, Any]:
+    """Connection pool usage per cluster and per tenant database."""
+    return db_manager.pool_stats()
+
+@router.get("/admission")
+async def admission_stats() -> Dict[str, Any]:
+    """Current adaptive concurrency limit, in-flight and shed counts per route group."""
+    return admission_controller.stats()
+
+@router.get("/pdf/pool")
+async def pdf_pool_stats() -> Dict[str, Any]:
+    """Browser context pool usage for PDF rendering."""
+    return pdf_service.stats()
+
+@router.get("/pdf/workers")
+async def pdf_worker_stats() -> Dict[str, Any]:
+    """PDF render worker processes (when `PDF_RENDER_WORKERS` > 0)."""
+    return render_farm.stats()
+
+@router.get("/pdf/cache")
+async def pdf_cache_stats() -> Dict[str, Any]:
+    """PDF result cache hit/miss counts."""
+    return pdf_cache.stats()
+
+@router.get("/artifacts")
+async def artifact_stats() -> Dict[str, Any]:
+    """Local artifact store usage."""
+    return artifact_store.stats()
+
+@router.post("/profiling", status_code=status.HTTP_201_CREATED)
+async def arm_profiler(request: ProfileCaptureRequest) -> Dict[str, Any]:
+    """
+    Profile the next `requests` requests matching `route` (path regex) and/or `project_id`
+    on this instance. A single request can also be profiled by sending `X-Profile: 1`.
+    """
+    try:
+        return profiler.arm(request).snapshot()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/profiling")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """Captures on this instance, newest last."""
+    return profiler.captures()
+
+@router.get("/profiling/{capture_id}")
+async def get_profile(capture_id: str) -> Dict[str, Any]:
+    """Profiled requests (with their folded stack files) and slow callbacks of a capture."""
+    capture = profiler.get(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return capture.snapshot()
+
+@router.get("/profiling/{capture_id}/files/{name}")
+async def download_profile(capture_id: str, name: str):
+    """A capture's folded stacks (`<n>-wall.folded`, `<n>-cpu.folded`) or `summary.json`."""
+    path = profiler.file_path(capture_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile file not found")
+    return FileResponse(path, media_type="text/plain" if name.endswith(".folded") else "application/json")
+
+@router.delete("/profiling/{capture_id}")
+async def disarm_profiler(capture_id: str) -> Dict[str, Any]:
+    """Stop profiling further requests for a capture."""
+    capture = profiler.disarm(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return capture.snapshot()
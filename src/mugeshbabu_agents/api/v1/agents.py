@@ -1,14 +1,17 @@
 from typing import Any, Dict
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from mugeshbabu_agents.domain.agents.service import agent_service
 from mugeshbabu_agents.domain.agents.models import AgentInstance
+from mugeshbabu_agents.core.middleware import bearer_token
+from mugeshbabu_agents.core.rate_limit import rate_limit
 
 router = APIRouter()
 
-@router.post("/execute/{master_agent_id}", response_model=AgentInstance)
+@router.post("/execute/{master_agent_id}", response_model=AgentInstance, dependencies=[Depends(rate_limit("execute"))])
 async def execute_agent_endpoint(
     master_agent_id: str,
     payload: Dict[str, Any],
+    http_request: Request,
     project_id: str = "default-project" # In real app, extract from JWT/Header
 ):
     """
@@ -21,7 +24,8 @@ async def execute_agent_endpoint(
         instance = await agent_service.execute_agent(
             master_agent_id=master_agent_id,
             project_id=project_id,
-            input_data=input_data
+            input_data=input_data,
+            user_token=bearer_token(http_request)
         )
         return instance
     except ValueError as e:
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
 from mugeshbabu_agents.domain.chat.service import chat_service
 from mugeshbabu_agents.domain.chat.models import ChatRequest, ChatResponse
+from mugeshbabu_agents.core.rate_limit import enforce_rate_limit
 
 router = APIRouter()
 
 @router.post("/message", response_model=ChatResponse)
-async def chat_message(request: ChatRequest):
+async def chat_message(request: ChatRequest, http_request: Request, response: Response):
     """
     Send a message to the chat agent regarding a document.
     """
+    await enforce_rate_limit("chat", http_request, response)
     try:
         response = await chat_service.chat(
             project_id=request.project_id,
@@ -1,20 +1,141 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from fastapi.responses import Response
-from mugeshbabu_agents.domain.documents.pdf_service import pdf_service
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+from mugeshbabu_agents.domain.documents.access import artifact_access
+from mugeshbabu_agents.domain.documents.bundle import BundleError, bundle_service
+from mugeshbabu_agents.domain.documents.jobs import pdf_job_service
+from mugeshbabu_agents.domain.documents.models import BundleRequest, BundleResult, PDFJob, PDFJobRequest, PDFRequest
+from mugeshbabu_agents.domain.documents.pdf_service import PDFStream
+from mugeshbabu_agents.domain.documents.browser_pool import BrowserPoolBusyError
+from mugeshbabu_agents.core.rate_limit import RateLimitResult, enforce_rate_limit, rate_limit
 
 router = APIRouter()
 
-class PDFRequest(BaseModel):
-    url: str
+def _user_id(request: Request):
+    user = getattr(request.state, "user", None) or {}
+    return user.get("sub")
+
+def _artifact_response(name: str, headers=None) -> FileResponse:
+    try:
+        path = artifact_store.path(name)
+    except ValueError:
+        path = None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, media_type="application/pdf", filename=name, headers=headers)
 
 @router.post("/pdf")
-async def generate_pdf(request: PDFRequest):
+async def generate_pdf(request: PDFRequest, http_request: Request, limit: RateLimitResult = Depends(rate_limit("pdf"))):
     """
     Generate a PDF from a URL. returns the PDF bytes.
+    Runs as a PDF job and waits for it; see /pdf/jobs to avoid holding the connection.
+    """
+    try:
+        artifact = await pdf_job_service.run(request.url, _user_id(http_request), request.profile)
+        # Returned responses don't inherit dependency headers, set them explicitly
+        headers = limit.headers() if limit.limit else {}
+        if isinstance(artifact, PDFStream):
+            # Source is already a PDF: relay it as it downloads
+            if artifact.size is not None:
+                headers["Content-Length"] = str(artifact.size)
+            return StreamingResponse(artifact.chunks, media_type="application/pdf", headers=headers)
+        headers["ETag"] = f'"{artifact.digest}"'
+        headers["X-Artifact-Name"] = artifact.name
+        if artifact.timings:
+            headers["Server-Timing"] = artifact.server_timing()
+        if artifact.content is None:
+            # Cached: stream the stored file instead of loading it
+            return FileResponse(artifact.path, media_type="application/pdf", headers=headers)
+        return Response(content=artifact.content, media_type="application/pdf", headers=headers)
+    except BrowserPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="PDF generation timed out")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/pdf/jobs", response_model=PDFJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_pdf_job(request: PDFJobRequest, http_request: Request, limit: RateLimitResult = Depends(rate_limit("pdf"))):
+    """Start generating a PDF in the background. Poll the job, then download it."""
+    try:
+        return await pdf_job_service.submit(request.url, _user_id(http_request), request.profile, request.timeout_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/pdf/jobs/{job_id}", response_model=PDFJob)
+async def get_pdf_job(job_id: str, http_request: Request):
+    """Get a PDF job's status."""
+    try:
+        job = await pdf_job_service.get(job_id, _user_id(http_request))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/pdf/jobs/{job_id}/download")
+async def download_pdf_job(job_id: str, http_request: Request):
+    """Download the PDF of a succeeded job."""
+    job = await pdf_job_service.get(job_id, _user_id(http_request))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "SUCCEEDED":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return _artifact_response(job.artifact_name)
+
+@router.delete("/pdf/jobs/{job_id}", response_model=PDFJob)
+async def cancel_pdf_job(job_id: str, http_request: Request):
+    """Cancel a queued or running PDF job."""
+    try:
+        job = await pdf_job_service.cancel(job_id, _user_id(http_request))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/pdf/bundle", responses={200: {"model": BundleResult, "content": {"application/pdf": {}}}})
+async def generate_bundle(request: BundleRequest, http_request: Request, response: Response):
     """
+    Render several URLs and merge them, in order, into one PDF with a bookmark per page.
+    Pages that fail are left out: they are listed in `X-Bundle-Failed-Pages` (indexes),
+    or in the returned report when `store` is set. Rate limited per page (`bundle` limit).
+    """
+    limit = await enforce_rate_limit("bundle", http_request, response, cost=len(request.pages))
     try:
-        pdf_bytes = await pdf_service.generate_pdf(request.url)
-        return Response(content=pdf_bytes, media_type="application/pdf")
+        result, artifact = await bundle_service.build(request)
+    except BundleError as e:
+        raise HTTPException(
+            status_code=502,
+            detail={"message": str(e), "pages": [page.model_dump() for page in e.pages]}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    await artifact_access.grant(_user_id(http_request), result.artifact_name)
+    if request.store:
+        return result
+
+    headers = limit.headers() if limit.limit else {}
+    headers["X-Artifact-Name"] = result.artifact_name
+    failed = [str(page.index) for page in result.pages if not page.ok]
+    if failed:
+        headers["X-Bundle-Failed-Pages"] = ",".join(failed)
+    return FileResponse(artifact.path, media_type="application/pdf", headers=headers)
+
+@router.get("/artifacts/{name}")
+async def get_artifact(name: str, http_request: Request):
+    """
+    Download a stored document by name (see the `X-Artifact-Name` header of /pdf).
+    Only artifacts produced by the caller's own jobs and bundles can be downloaded.
+    """
+    if not await artifact_access.allowed(_user_id(http_request), name):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return _artifact_response(name)
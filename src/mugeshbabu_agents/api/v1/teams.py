@@ -1,11 +1,19 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from mugeshbabu_agents.domain.teams.service import team_service
-from mugeshbabu_agents.domain.teams.models import Team, CreateTeamRequest
+from mugeshbabu_agents.domain.teams.models import Team, CreateTeamRequest, ExecuteTeamRequest, TeamAgentPage, TeamExecution, TeamMembershipStatus
 from mugeshbabu_agents.domain.agents.models import Agent
+from mugeshbabu_agents.infrastructure.repository import InvalidCursorError
+from mugeshbabu_agents.core.middleware import bearer_token
+from mugeshbabu_agents.core.rate_limit import rate_limit
+from mugeshbabu_agents.core.serialization import FastJSONResponse, dumps
 
 router = APIRouter()
 
+# Fields that may be requested through `?fields=` (stored names, i.e. `_id` rather than `id`)
+AGENT_FIELDS = {field.alias or name for name, field in Agent.model_fields.items()}
+
 @router.post("/", response_model=Team)
 async def create_team(request: CreateTeamRequest):
     """Create a new team."""
@@ -23,12 +31,86 @@ async def get_team(team_id: str):
         raise HTTPException(status_code=404, detail="Team not found")
     return team
 
-@router.get("/{team_id}/agents", response_model=List[Agent])
-async def get_team_agents(team_id: str):
-    """Get all agents associated with a team (static + dynamic)."""
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse `?fields=a,b` into stored field names, rejecting unknown ones."""
+    if not fields:
+        return None
+    projection = ["_id" if f.strip() == "id" else f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(projection) - AGENT_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown agent fields: {', '.join(sorted(unknown))}")
+    return projection
+
+@router.get("/{team_id}/agents", response_model=TeamAgentPage)
+async def get_team_agents(
+    team_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated agent fields to return, e.g. 'name,description'")
+):
+    """Get a page of agents associated with a team (static + dynamic)."""
+    projection = _parse_fields(fields)
+    try:
+        page = await team_service.get_team_agents_page(team_id, limit=limit, cursor=cursor, fields=projection)
+        # Items are raw documents: encode them directly rather than validating and dumping them again
+        return FastJSONResponse({"items": page.items, "next_cursor": page.next_cursor})
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{team_id}/agents/export")
+async def export_team_agents(
+    team_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated agent fields to return, e.g. 'name,description'")
+):
+    """Export all agents of a team as newline-delimited JSON, streamed in batches."""
+    projection = _parse_fields(fields)
+    if not await team_service.get_team(team_id):
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    async def ndjson():
+        async for doc in team_service.stream_team_agents(team_id, fields=projection):
+            yield dumps(doc) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/{team_id}/membership", response_model=TeamMembershipStatus)
+async def get_team_membership(team_id: str):
+    """Report staleness of the team's materialized membership."""
+    try:
+        return await team_service.get_membership_status(team_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/{team_id}/membership/rebuild", response_model=TeamMembershipStatus)
+async def rebuild_team_membership(team_id: str):
+    """Force a rebuild of the team's materialized membership."""
+    try:
+        return await team_service.rebuild_membership(team_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{team_id}/execute", response_model=TeamExecution, dependencies=[Depends(rate_limit("execute"))])
+async def execute_team(
+    team_id: str,
+    request: ExecuteTeamRequest,
+    http_request: Request,
+    project_id: str = "default-project" # In real app, extract from JWT/Header
+):
+    """Execute every agent of a team and return an aggregate job handle."""
     try:
-        agents = await team_service.get_team_agents(team_id)
-        return agents
+        return await team_service.execute_team(
+            team_id,
+            project_id=project_id,
+            input_data=request.input_data,
+            user_token=bearer_token(http_request),
+            concurrency=request.concurrency
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
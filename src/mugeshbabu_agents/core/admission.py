@@ -0,0 +1,174 @@
+import logging
+import math
+import re
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.serialization import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Latency samples observed before the limit starts adapting
+WARMUP_SAMPLES = 10
+
+class AdaptiveLimit:
+    """
+    Concurrency limit adjusted from observed latency (gradient + AIMD).
+
+    Two moving averages of latency are kept: a slow one (`smoothing`) as the long-term
+    baseline and a fast one (`recent_smoothing`) for current conditions, so a single
+    fast or slow request moves neither much. While recent latency stays within
+    `tolerance` x baseline the limit grows additively (+1 per limit's worth of
+    successes); when it exceeds it, or a request fails, the limit is cut
+    multiplicatively by `backoff`.
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 tolerance: float = 2.0, backoff: float = 0.9, smoothing: float = 0.05, recent_smoothing: float = 0.3):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.recent_smoothing = recent_smoothing
+        self.in_flight = 0
+        self.baseline: Optional[float] = None # Seconds
+        self.recent: Optional[float] = None # Seconds
+        self.samples = 0
+        self.shed = 0
+        self.admitted = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, latency: Optional[float], failed: bool = False):
+        """Free the slot. `latency` is None for requests that say nothing about load (e.g. 4xx)."""
+        self.in_flight -= 1
+        if failed:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+        if latency is None:
+            return
+
+        self.samples += 1
+        if self.baseline is None:
+            self.baseline = self.recent = latency
+        else:
+            # A plain running mean until there are enough samples, so one odd first request doesn't set the baseline
+            self.recent += max(self.recent_smoothing, 1 / self.samples) * (latency - self.recent)
+            self.baseline += max(self.smoothing, 1 / self.samples) * (latency - self.baseline)
+        if self.samples < WARMUP_SAMPLES:
+            return
+
+        if self.recent > self.baseline * self.tolerance:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def retry_after(self) -> int:
+        """Rough wait (seconds) before a slot frees up."""
+        return max(1, math.ceil(self.baseline or 1))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "baseline_ms": round(self.baseline * 1000, 2) if self.baseline is not None else None,
+            "recent_ms": round(self.recent * 1000, 2) if self.recent is not None else None,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+class AdmissionController:
+    """
+    One adaptive concurrency limit per route group (`settings.admission.groups`, regexes
+    matched against the path). Paths matching `exempt_paths` (health, auth, ...) are
+    never limited.
+    """
+
+    def __init__(self):
+        cfg = settings.admission
+        self.limits = {
+            name: AdaptiveLimit(
+                name,
+                initial=cfg.initial_limits.get(name, cfg.initial_limit),
+                min_limit=cfg.min_limit,
+                max_limit=cfg.max_limits.get(name, cfg.max_limit),
+                tolerance=cfg.latency_tolerance,
+                backoff=cfg.backoff,
+            )
+            for name in cfg.groups
+        }
+        self._exempt = re.compile("|".join(re.escape(p) for p in cfg.exempt_paths)) if cfg.exempt_paths else None
+        self._groups = [(re.compile(pattern), name) for name, pattern in cfg.groups.items()]
+
+    def limit_for(self, path: str) -> Optional[AdaptiveLimit]:
+        if self._exempt and self._exempt.match(path):
+            return None
+        for pattern, name in self._groups:
+            if pattern.match(path):
+                return self.limits[name]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limit.snapshot() for name, limit in self.limits.items()}
+
+admission_controller = AdmissionController()
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI admission control. Requests over their group's limit get an immediate
+    503 with `Retry-After` instead of queueing inside the server.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.admission.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.controller.limit_for(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not limit.try_acquire():
+            response = FastJSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"error": "Service Unavailable", "message": f"Too many concurrent {limit.name} requests, please retry"},
+                headers={"Retry-After": str(limit.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        latency = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, latency
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to the response head; streaming the body depends on the client
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Client errors and rate limited requests did no real work, don't learn from them
+            limit.release(latency if status_code < 400 else None, failed=status_code >= 500)
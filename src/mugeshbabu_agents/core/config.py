@@ -1,6 +1,6 @@
 import os
-from typing import Optional, Literal
-from pydantic import Field
+from typing import Dict, List, Optional, Literal
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class AppConfig(BaseSettings):
@@ -9,15 +9,27 @@ class AppConfig(BaseSettings):
     log_level: str = "INFO"
     project_name: str = "BabuAI Agents Service"
     debug: bool = False
+    json_backend: Literal["auto", "orjson", "json"] = "auto" # auto: orjson if installed
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
+class TenantRoute(BaseModel):
+    """Where a project's database lives."""
+    uri: Optional[str] = None # Defaults to MONGO_URI
+    read_preference: Optional[Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]] = None
+
 class MongoConfig(BaseSettings):
     """MongoDB configuration."""
     uri: str = Field("mongodb://localhost:27017", alias="MONGO_URI")
     db_name: str = Field("babuai-masterdb", alias="MONGO_DB_NAME")
     min_pool_size: int = 10
     max_pool_size: int = 100
+    ensure_indexes: bool = True # Create declared indexes at startup and on first use of a project DB
+    project_db_cache_size: int = 1024 # Project DB handles kept in the LRU cache
+    # Per-project routing, e.g. MONGO_TENANT_ROUTES='{"big-project": {"uri": "mongodb://heavy:27017", "read_preference": "secondaryPreferred"}}'
+    tenant_routes: Dict[str, TenantRoute] = Field(default_factory=dict, alias="MONGO_TENANT_ROUTES")
+    max_clusters: int = Field(4, alias="MONGO_MAX_CLUSTERS") # Upper bound on connection pools (one per cluster URI)
+    routed_max_pool_size: int = 50 # Pool size of each additional cluster
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -44,9 +56,171 @@ class AuthConfig(BaseSettings):
     jwt_secret: str = Field("change_me_in_production", alias="SECRET_KEY")
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    admin_emails: List[str] = [] # Users allowed to call /api/v1/admin endpoints
+    token_cache_size: int = 10000 # Verified JWTs kept in the auth middleware's LRU
+    # Argon2 cost parameters, defaulting to passlib's own (t=3, m=64 MiB, p=4) so
+    # existing hashes stay valid as is. Changing them rehashes each user's password
+    # with the new parameters on their next login.
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536 # KiB
+    argon2_parallelism: int = 4
+    hash_workers: int = 2 # Threads dedicated to password hashing
+    hash_queue_limit: int = 32 # Waiting hash operations before returning 503
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
+class AgentConfig(BaseSettings):
+    """Agent execution configuration."""
+    team_fanout_concurrency: int = 10
+    sqs_batch_size: int = 10 # SQS SendMessageBatch accepts at most 10 entries
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="AGENTS_", extra="ignore")
+
+class TeamConfig(BaseSettings):
+    """Team membership configuration."""
+    membership_watch: bool = True # Invalidate materialized membership through change streams
+    membership_max_age_seconds: int = 300 # Expiry used when change streams are unavailable
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="TEAMS_", extra="ignore")
+
+class ChatConfig(BaseSettings):
+    """Chat (RAG) configuration."""
+    max_history_messages: int = 200 # Older messages are dropped from stored conversations
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="CHAT_", extra="ignore")
+
+class RateLimitConfig(BaseSettings):
+    """Per-route rate limits ("<count>/<second|minute|hour|day>"), keyed by user and project."""
+    enabled: bool = True
+    execute: str = "60/minute"
+    chat: str = "30/minute"
+    pdf: str = "10/minute"
+    bundle: str = "200/minute" # Counted per page of the bundle
+    signup: str = "5/minute" # Keyed by client IP
+    login: str = "20/minute" # Keyed by client IP
+    # Requests are admitted without a Redis call while the last known count is below
+    # this fraction of the limit, for at most `local_max_pending` requests per sync.
+    local_threshold: float = 0.5
+    local_max_pending: int = 10
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="RATE_LIMIT_", extra="ignore")
+
+class AdmissionConfig(BaseSettings):
+    """Adaptive concurrency limits (load shedding) per route group."""
+    enabled: bool = True
+    # Group name -> path regex
+    groups: Dict[str, str] = {
+        "pdf": r"/api/v1/documents/pdf(/bundle)?$", # Synchronous renders only
+        "chat": r"/api/v1/chat",
+        "execute": r"/api/v1/(agents/execute|teams/[^/]+/execute)",
+    }
+    exempt_paths: List[str] = ["/health", "/api/v1/auth"] # Never shed
+    initial_limit: int = 20
+    initial_limits: Dict[str, int] = {"pdf": 4}
+    min_limit: int = 1
+    max_limit: int = 200
+    max_limits: Dict[str, int] = {"pdf": 16}
+    latency_tolerance: float = 2.0 # Latency above tolerance x baseline shrinks the limit
+    backoff: float = 0.9 # Multiplicative decrease
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="ADMISSION_", extra="ignore")
+
+class HttpConfig(BaseSettings):
+    """Shared outbound HTTP client."""
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="HTTP_", extra="ignore")
+
+ANALYTICS_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "segment.io",
+    "hotjar.com", "mixpanel.com", "facebook.net", "clarity.ms",
+]
+
+class RenderProfile(BaseModel):
+    """How a page is loaded and when it counts as ready to print."""
+    wait_until: Literal["commit", "domcontentloaded", "load", "networkidle"] = "load"
+    blocked_resource_types: List[str] = [] # Playwright resource types, e.g. "image", "media", "font"
+    blocked_domains: List[str] = [] # Requests to these hosts (and subdomains) are aborted
+    # The page is ready once none of these match, e.g. diagrams not rendered yet
+    pending_selectors: List[str] = [".mermaid:not(:has(svg))"]
+    ready_timeout_ms: int = 5000
+
+class PDFConfig(BaseSettings):
+    """PDF rendering: browser context pool and result cache."""
+    pool_size: int = 4 # Contexts rendering at once
+    max_renders_per_context: int = 50 # Recycle a context after this many renders
+    acquire_timeout: float = 30.0 # Seconds to wait for a free context
+    max_waiters: int = 100 # Requests allowed to queue for a context
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 86400
+    cache_revalidate: bool = True # Conditional HEAD to the source before serving a hit
+    stream_chunk_size: int = 64 * 1024 # Direct PDF downloads are relayed in chunks of this size
+    stream_queue_chunks: int = 8 # Chunks buffered for the storage upload before backpressure
+    stream_idle_timeout_seconds: float = 30.0 # A relayed download fails if the source sends nothing for this long
+    render_workers: int = 0 # Render in this many worker processes; 0 renders in-process
+    job_timeout_seconds: float = 120.0
+    job_retention_seconds: int = 7 * 86400 # Job records are removed after this (TTL index)
+    bundle_concurrency: int = 4 # Pages of one bundle rendered at once
+    bundle_max_pages: int = 100
+    default_profile: str = "default"
+    profiles: Dict[str, RenderProfile] = {
+        "default": RenderProfile(blocked_resource_types=["media", "websocket", "eventsource"], blocked_domains=ANALYTICS_DOMAINS),
+        "fast": RenderProfile(
+            wait_until="domcontentloaded",
+            blocked_resource_types=["image", "media", "font", "websocket", "eventsource"],
+            blocked_domains=ANALYTICS_DOMAINS,
+        ),
+        "full": RenderProfile(wait_until="networkidle"), # Waits for all network activity to stop
+    }
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="PDF_", extra="ignore")
+
+class ArtifactConfig(BaseSettings):
+    """
+    Local store for generated and downloaded documents. Limits are enforced by each
+    worker process on the files it knows of, so with N workers sharing `directory`
+    the store can grow to N x `max_bytes`.
+    """
+    directory: str = "downloads"
+    max_bytes: int = 2 * 1024 ** 3 # Per process
+    ttl_seconds: int = 7 * 86400 # 0 disables expiry
+    index_flush_seconds: float = 5.0 # Access times are persisted at most this often
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="ARTIFACTS_", extra="ignore")
+
+class MetricsConfig(BaseSettings):
+    """Prometheus metrics."""
+    enabled: bool = True
+    path: str = "/metrics" # Served without authentication; restrict it at the ingress
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="METRICS_", extra="ignore")
+
+class ProfilingConfig(BaseSettings):
+    """On-demand sampling profiler for live requests (armed from the admin API)."""
+    enabled: bool = True # Install the profiling middleware at all
+    directory: str = "profiles" # Folded stacks and capture summaries
+    sample_interval_ms: float = 5.0
+    slow_callback_ms: float = 100.0 # Event loop blocked for longer than this is reported
+    max_requests: int = 50 # Per capture
+    capture_ttl_seconds: int = 3600 # Armed captures expire after this
+    max_stack_depth: int = 128
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="PROFILING_", extra="ignore")
+
+class LifecycleConfig(BaseSettings):
+    """Startup warm-up, readiness and graceful shutdown."""
+    warm_connections: int = 2 # Connections opened per Mongo cluster and for Redis at startup
+    prelaunch_browser: bool = False # Launch the browser (or render workers) at startup
+    step_timeout_seconds: float = 15.0 # Per warm-up step; a step that times out marks its resource down
+    required: List[str] = ["mongo"] # Resources without which the instance reports not ready
+    readiness_interval_seconds: float = 5.0 # Readiness probes re-check resources at most this often
+    drain_timeout_seconds: float = 20.0 # Shutdown waits this long for running PDF jobs
+
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="LIFECYCLE_", extra="ignore")
+
 class Settings(BaseSettings):
     """Global settings container."""
     app: AppConfig = Field(default_factory=AppConfig)
@@ -54,6 +228,17 @@ class Settings(BaseSettings):
     redis: RedisConfig = Field(default_factory=RedisConfig)
     aws: AWSConfig = Field(default_factory=AWSConfig)
     auth: AuthConfig = Field(default_factory=AuthConfig)
+    agents: AgentConfig = Field(default_factory=AgentConfig)
+    teams: TeamConfig = Field(default_factory=TeamConfig)
+    chat: ChatConfig = Field(default_factory=ChatConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    pdf: PDFConfig = Field(default_factory=PDFConfig)
+    artifacts: ArtifactConfig = Field(default_factory=ArtifactConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    profiling: ProfilingConfig = Field(default_factory=ProfilingConfig)
+    lifecycle: LifecycleConfig = Field(default_factory=LifecycleConfig)
 
     def load_secrets(self):
         """
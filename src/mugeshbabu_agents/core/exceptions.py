@@ -1,5 +1,5 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from mugeshbabu_agents.core.serialization import FastJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import logging
@@ -13,7 +13,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled Exception ID: {error_id} - {exc}")
     logger.error(traceback.format_exc())
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal Server Error",
@@ -23,13 +23,14 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
-        content={"error": "HTTP Error", "message": exc.detail}
+        content={"error": "HTTP Error", "message": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"error": "Validation Error", "details": exc.errors()}
     )
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.redis_client import redis_manager
+from mugeshbabu_agents.infrastructure.http_client import http_client
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+from mugeshbabu_agents.domain.auth.hashing import password_hasher
+from mugeshbabu_agents.domain.documents.jobs import pdf_job_service
+from mugeshbabu_agents.domain.documents.pdf_service import pdf_service
+from mugeshbabu_agents.domain.teams.membership import membership_service
+
+logger = logging.getLogger(__name__)
+
+STARTING, RUNNING, DRAINING, STOPPED = "starting", "running", "draining", "stopped"
+
+@dataclass
+class ResourceCheck:
+    ok: bool
+    latency_ms: float
+    checked_at: datetime
+    error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"ok": self.ok, "latency_ms": self.latency_ms, "checked_at": self.checked_at.isoformat(), "error": self.error}
+
+class ResourceManager:
+    """
+    Owns the startup and shutdown of every pool. Startup connects Mongo, warms the
+    Mongo and Redis pools with concurrent pings, creates the HTTP client, optionally
+    launches the browser and ensures indexes, so the first requests don't pay for any
+    of it. Readiness (can this instance take traffic?) is tracked apart from liveness
+    (is the process responsive?): a resource in `settings.lifecycle.required` being
+    down, or a shutdown in progress, makes the instance not ready. Shutdown waits for
+    running PDF jobs, then closes the pools in reverse dependency order.
+
+    In-flight HTTP requests are not tracked here: the server stops accepting
+    connections and drains requests before the lifespan shutdown runs, for up to
+    uvicorn's `--timeout-graceful-shutdown` (gunicorn's `--graceful-timeout`).
+    """
+
+    def __init__(self):
+        self.state = STARTING
+        self.started_at = time.monotonic()
+        self.checks: Dict[str, ResourceCheck] = {}
+        self._checked_at = 0.0
+        self._check_lock: Optional[asyncio.Lock] = None
+
+    async def _step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """Run one warm-up/check step with a timeout and record the result under `name`."""
+        start = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(fn(), settings.lifecycle.step_timeout_seconds)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {settings.lifecycle.step_timeout_seconds:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        previous = self.checks.get(name)
+        self.checks[name] = ResourceCheck(ok=error is None, latency_ms=latency_ms, checked_at=datetime.utcnow(), error=error)
+        # Readiness probes re-run the checks every few seconds, only log changes
+        if error and (previous is None or previous.ok):
+            logger.error(f"{name} is unavailable: {error}")
+        elif not error and previous is None:
+            logger.info(f"{name} ready in {latency_ms}ms")
+        elif not error and not previous.ok:
+            logger.info(f"{name} is available again")
+        return error is None
+
+    async def _warm_http(self):
+        http_client.client # Creates the client and its pool
+
+    async def startup(self):
+        start = time.perf_counter()
+        await db_manager.connect()
+
+        cfg = settings.lifecycle
+        steps = [
+            self._step("mongo", lambda: db_manager.ping(cfg.warm_connections)),
+            self._step("redis", lambda: redis_manager.ping(cfg.warm_connections)),
+            self._step("http", self._warm_http),
+        ]
+        if cfg.prelaunch_browser:
+            steps.append(self._step("browser", pdf_service.start))
+        await asyncio.gather(*steps)
+        self._checked_at = time.monotonic()
+
+        if settings.mongo.ensure_indexes and self.checks["mongo"].ok:
+            try:
+                await db_manager.ensure_indexes()
+            except Exception as e:
+                logger.error(f"Index creation failed, continuing without it: {e}")
+        membership_service.start()
+
+        self.state = RUNNING
+        down = [name for name, check in self.checks.items() if not check.ok]
+        logger.info(
+            f"Startup finished in {(time.perf_counter() - start) * 1000:.0f}ms"
+            + (f", unavailable: {', '.join(down)}" if down else "")
+        )
+
+    async def refresh(self):
+        """Re-ping Mongo and Redis if the last check is older than `readiness_interval_seconds`."""
+        if self._check_lock is None:
+            self._check_lock = asyncio.Lock()
+        async with self._check_lock:
+            if time.monotonic() - self._checked_at < settings.lifecycle.readiness_interval_seconds:
+                return
+            await asyncio.gather(self._step("mongo", db_manager.ping), self._step("redis", redis_manager.ping))
+            self._checked_at = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        if self.state != RUNNING:
+            return False
+        return all(self.checks[name].ok for name in settings.lifecycle.required if name in self.checks)
+
+    async def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        if self.state == RUNNING:
+            await self.refresh()
+        return self.ready, {
+            "status": "ready" if self.ready else "not_ready",
+            "state": self.state,
+            "checks": {name: check.snapshot() for name, check in self.checks.items()},
+        }
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"state": self.state, "uptime_seconds": round(time.monotonic() - self.started_at)}
+
+    async def _close(self, name: str, fn: Callable[[], Any]):
+        """Run one close step; a failing step is logged and doesn't stop the others."""
+        try:
+            result = fn()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Closing {name} failed: {e}")
+
+    async def shutdown(self):
+        self.state = DRAINING
+        await pdf_job_service.drain(settings.lifecycle.drain_timeout_seconds)
+
+        # Background work first, then what it renders with, then the pools everything uses
+        await self._close("membership watch", membership_service.stop)
+        await self._close("pdf jobs", pdf_job_service.shutdown)
+        await self._close("browser", pdf_service.close)
+        await self._close("password hasher", password_hasher.shutdown)
+        await self._close("artifact store", artifact_store.close)
+        await self._close("http client", http_client.close)
+        await self._close("redis", redis_manager.close)
+        await self._close("mongo", db_manager.close)
+        self.state = STOPPED
+
+resource_manager = ResourceManager()
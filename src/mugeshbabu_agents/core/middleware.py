@@ -1,77 +1,127 @@
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+import hashlib
 import logging
 import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import jwt
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.serialization import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, public_paths: list[str] = None):
-        super().__init__(app)
-        self.public_paths = public_paths or []
-        # Compile regex for public paths to handle wildcards or specific patterns if needed
-        # For now, exact match or simple prefix checking is sufficient.
-        
-        # Adding standard public paths
-        self.public_paths.extend([
-            "/health",
-            "/docs",
-            "/openapi.json",
-            "/redoc",
-            "/api/v1/auth" # Login and Signup must be public
-        ])
-
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        
-        # Check if path is public
-        if any(path.startswith(p) for p in self.public_paths):
-            return await call_next(request)
+# Standard public paths (Login and Signup must be public)
+DEFAULT_PUBLIC_PATHS = ["/health", "/docs", "/openapi.json", "/redoc", "/api/v1/auth"]
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified JWT payloads, keyed by the SHA-256 of the token.
+    Entries are only served until the token's `exp`, so expiry is still enforced.
+    Only used from the event loop, so no locking.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, Dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key: bytes, payload: Dict[str, Any]):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return # Tokens without expiry are never cached
+        self._entries[key] = (float(exp), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+class AuthMiddleware:
+    """
+    Pure ASGI JWT authentication.
+    Verified payloads are stored in `request.state.user`. Responses (including
+    streaming ones) are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, public_paths: list[str] = None, token_cache_size: int = None):
+        self.app = app
+        self.public_paths = (public_paths or []) + DEFAULT_PUBLIC_PATHS
+        # One precompiled prefix matcher instead of a startswith() scan per request
+        self._public = re.compile("|".join(re.escape(p) for p in self.public_paths))
+        self.token_cache = VerifiedTokenCache(token_cache_size or settings.auth.token_cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self._public.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
+        payload, error = self._authenticate(scope)
+        if error is not None:
+            response = FastJSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": error})
+            await response(scope, receive, send)
+            return
+
+        # Inject user info into request state
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    def _authenticate(self, scope: Scope) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
         # 1. Check for Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("authorization")
         if not auth_header:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Missing Authorization header"}
-            )
+            return None, "Missing Authorization header"
 
         # 2. Validate Bearer token format
-        try:
-            scheme, token = auth_header.split()
-            if scheme.lower() != "bearer":
-                raise ValueError("Invalid credentials scheme")
-        except ValueError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid Authorization header format. Expected 'Bearer <token>'"}
-            )
+        scheme, _, token = auth_header.partition(" ")
+        token = token.strip()
+        if scheme.lower() != "bearer" or not token or " " in token:
+            return None, "Invalid Authorization header format. Expected 'Bearer <token>'"
+
+        # 3. Verify Token (cached until it expires)
+        key = self.token_cache.key(token)
+        payload = self.token_cache.get(key)
+        if payload is not None:
+            return payload, None
 
-        # 3. Verify Token
         try:
-            from mugeshbabu_agents.core.config import settings
-            import jwt
-            
             payload = jwt.decode(
-                token, 
-                settings.auth.jwt_secret, 
+                token,
+                settings.auth.jwt_secret,
                 algorithms=[settings.auth.jwt_algorithm]
             )
-            # Inject user info into request state
-            request.state.user = payload
-            
         except jwt.ExpiredSignatureError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token has expired"}
-            )
+            return None, "Token has expired"
         except jwt.PyJWTError as e:
             logger.error(f"JWT Verification Failed: {e}")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Could not validate credentials"}
-            )
-            
-        return await call_next(request)
+            return None, "Could not validate credentials"
+
+        self.token_cache.put(key, payload)
+        return payload, None
+
+def bearer_token(request: Request) -> Optional[str]:
+    """The caller's raw JWT (verified by AuthMiddleware), e.g. to hand on to agent workers."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return token.strip() or None
@@ -0,0 +1,449 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from pydantic import BaseModel, Field
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mugeshbabu_agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile" # Sent by an admin to profile that one request
+CAPTURE_HEADER = b"x-profile-capture" # Added to profiled responses
+VALID_CAPTURE_ID = re.compile(r"^[0-9a-f]{32}$")
+VALID_FILE_NAME = re.compile(r"^(\d+-(wall|cpu)\.folded|summary\.json)$")
+MAX_SLOW_CALLBACKS = 100
+MAX_CAPTURES = 100 # Kept in memory; older ones remain on disk
+
+# The profile of the request whose code is running (inherited by the tasks it starts)
+_current_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("current_profile", default=None)
+
+# Stacks are cut at the profiling middleware (the request's root) or, for tasks the
+# request started, at the event loop callback running them
+_ROOT_CODES = {asyncio.events.Handle._run.__code__}
+
+class ProfileCaptureRequest(BaseModel):
+    requests: int = Field(1, ge=1) # Profile the next N matching requests
+    route: Optional[str] = None # Regex matched against the request path
+    project_id: Optional[str] = None # `project_id` query/body field or `X-Project-Id` header
+    ttl_seconds: Optional[int] = Field(None, gt=0)
+
+def _label(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _running_stack(frame) -> str:
+    """Folded stack (outermost first) of the running code, up to the event loop callback."""
+    labels = []
+    while frame is not None and frame.f_code not in _ROOT_CODES and len(labels) < settings.profiling.max_stack_depth:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+def _waiting_stack(coro) -> str:
+    """Folded stack of a suspended coroutine, following what each frame awaits."""
+    labels = []
+    while coro is not None and len(labels) < settings.profiling.max_stack_depth:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        if frame.f_code in _ROOT_CODES:
+            labels.clear()
+        else:
+            labels.append(_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    labels.append("[waiting]")
+    return ";".join(labels)
+
+@dataclass
+class Capture:
+    """An armed request to profile the next `remaining` requests matching the filters."""
+    id: str
+    remaining: int
+    route: Optional[str]
+    project_id: Optional[str]
+    expires_at: float
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    requests: List[Dict[str, Any]] = field(default_factory=list)
+    slow_callbacks: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._pattern = re.compile(self.route) if self.route else None
+        self._profiled = 0
+
+    @property
+    def armed(self) -> bool:
+        return self.remaining > 0 and time.time() < self.expires_at
+
+    def matches(self, path: str, project_id: Optional[str]) -> bool:
+        if self._pattern and not self._pattern.search(path):
+            return False
+        return self.project_id is None or self.project_id == project_id
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "armed": self.armed,
+            "remaining": self.remaining if self.armed else 0,
+            "route": self.route,
+            "project_id": self.project_id,
+            "created_at": self.created_at.isoformat(),
+            "requests": self.requests,
+            "slow_callbacks": self.slow_callbacks,
+        }
+
+@dataclass
+class RequestProfile:
+    capture: Capture
+    index: int
+    method: str
+    path: str
+    task: asyncio.Task
+    started: float = field(default_factory=time.perf_counter)
+    wall: Counter = field(default_factory=Counter)
+    cpu: Counter = field(default_factory=Counter)
+
+class Profiler:
+    """
+    On-demand sampling profiler for live requests.
+
+    An admin arms a capture (next N requests matching a path regex and/or project), or
+    sends `X-Profile: 1` on a request. While a profiled request is in flight, interval
+    timers sample the event loop thread: SIGPROF on CPU time, SIGALRM on wall time.
+    CPU samples are attributed to the request whose code was running (through a context
+    variable, so tasks it starts count too). Wall samples also record where each
+    profiled request is waiting when it isn't running. While a capture is armed, a
+    watchdog thread reports callbacks that block the event loop, with their stack.
+
+    Stacks are written in the folded format (flamegraph.pl, speedscope) under
+    `settings.profiling.directory/<capture id>/`. Nothing runs while no capture is armed
+    and no profiled request is in flight. Captures are per process, and sampling needs
+    the event loop in the main thread (as under uvicorn).
+    """
+
+    def __init__(self):
+        self._captures: Dict[str, Capture] = {}
+        self._active: List[RequestProfile] = []
+        self._previous_handlers: Dict[int, Any] = {}
+        self.armed = False
+        # Watchdog state
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._watch_stop: Optional[threading.Event] = None
+
+    @staticmethod
+    def supported() -> bool:
+        return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    # Captures
+
+    def _add(self, capture: Capture):
+        self._captures[capture.id] = capture
+        active = {profile.capture.id for profile in self._active}
+        for capture_id in list(self._captures):
+            if len(self._captures) <= MAX_CAPTURES:
+                break
+            if capture_id not in active and not self._captures[capture_id].armed:
+                del self._captures[capture_id]
+
+    def _refresh(self):
+        self.armed = any(capture.armed for capture in self._captures.values())
+        if self.armed:
+            self._start_watchdog()
+
+    def arm(self, request: ProfileCaptureRequest) -> Capture:
+        """Profile the next matching requests. Raises ValueError for bad filters."""
+        if not self.supported():
+            raise ValueError("Profiling needs setitimer and the event loop in the main thread")
+        if request.requests > settings.profiling.max_requests:
+            raise ValueError(f"At most {settings.profiling.max_requests} requests can be profiled at once")
+        try:
+            capture = Capture(
+                id=uuid.uuid4().hex,
+                remaining=request.requests,
+                route=request.route,
+                project_id=request.project_id,
+                expires_at=time.time() + (request.ttl_seconds or settings.profiling.capture_ttl_seconds),
+            )
+        except re.error as e:
+            raise ValueError(f"Invalid route pattern: {e}")
+        self._add(capture)
+        self._refresh()
+        logger.warning(f"Profiling armed: capture {capture.id}, {capture.remaining} requests, route={capture.route} project={capture.project_id}")
+        return capture
+
+    def disarm(self, capture_id: str) -> Optional[Capture]:
+        capture = self._captures.get(capture_id)
+        if capture is not None:
+            capture.remaining = 0
+            self._refresh()
+        return capture
+
+    def get(self, capture_id: str) -> Optional[Capture]:
+        return self._captures.get(capture_id)
+
+    def captures(self) -> List[Dict[str, Any]]:
+        return [
+            {**capture.snapshot(), "requests": len(capture.requests), "slow_callbacks": len(capture.slow_callbacks)}
+            for capture in self._captures.values()
+        ]
+
+    def needs_project(self, path: str) -> bool:
+        """Whether an armed capture for `path` filters on the project."""
+        return any(capture.armed and capture.project_id and capture.matches(path, capture.project_id) for capture in self._captures.values())
+
+    def claim(self, path: str, project_id: Optional[str]) -> Optional[Capture]:
+        """The first armed capture matching the request, counting the request against it."""
+        for capture in self._captures.values():
+            if capture.armed and capture.matches(path, project_id):
+                capture.remaining -= 1
+                self._refresh()
+                return capture
+        self._refresh() # Expiry
+        return None
+
+    def adhoc(self) -> Capture:
+        """A single-request capture for `X-Profile`."""
+        capture = Capture(id=uuid.uuid4().hex, remaining=0, route=None, project_id=None, expires_at=time.time())
+        self._add(capture)
+        return capture
+
+    # Sampling
+
+    def _on_cpu(self, signum, frame):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.cpu[_running_stack(frame)] += 1
+
+    def _on_wall(self, signum, frame):
+        current = _current_profile.get()
+        for profile in self._active:
+            if profile is current:
+                profile.wall[_running_stack(frame)] += 1
+            else:
+                profile.wall[_waiting_stack(profile.task.get_coro())] += 1
+
+    def _start_timers(self):
+        interval = settings.profiling.sample_interval_ms / 1000
+        self._previous_handlers = {
+            signal.SIGPROF: signal.signal(signal.SIGPROF, self._on_cpu),
+            signal.SIGALRM: signal.signal(signal.SIGALRM, self._on_wall),
+        }
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        signal.setitimer(signal.ITIMER_REAL, interval, interval)
+
+    def _stop_timers(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+
+    def start(self, capture: Capture, scope: Scope) -> RequestProfile:
+        capture._profiled += 1
+        profile = RequestProfile(
+            capture=capture,
+            index=capture._profiled,
+            method=scope["method"],
+            path=scope["path"],
+            task=asyncio.current_task(),
+        )
+        self._active.append(profile)
+        if len(self._active) == 1:
+            self._start_timers()
+            self._start_watchdog()
+        return profile
+
+    def finish(self, profile: RequestProfile, status: int):
+        self._active.remove(profile)
+        if not self._active:
+            self._stop_timers()
+
+        capture = profile.capture
+        duration_ms = (time.perf_counter() - profile.started) * 1000
+        directory = os.path.join(settings.profiling.directory, capture.id)
+        files = {}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for mode, samples in (("wall", profile.wall), ("cpu", profile.cpu)):
+                name = f"{profile.index}-{mode}.folded"
+                with open(os.path.join(directory, name), "w") as f:
+                    f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
+                files[mode] = name
+        except OSError as e:
+            logger.error(f"Failed to write profile for capture {capture.id}: {e}")
+
+        capture.requests.append({
+            "index": profile.index,
+            "method": profile.method,
+            "path": profile.path,
+            "status": status,
+            "duration_ms": round(duration_ms, 1),
+            "wall_samples": sum(profile.wall.values()),
+            "cpu_samples": sum(profile.cpu.values()),
+            "files": files,
+        })
+        self._write_summary(capture)
+        logger.warning(f"Profiled {profile.method} {profile.path} ({duration_ms:.0f}ms) into capture {capture.id}")
+
+    def _write_summary(self, capture: Capture):
+        directory = os.path.join(settings.profiling.directory, capture.id)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, "summary.json"), "w") as f:
+                json.dump(capture.snapshot(), f, indent=2)
+        except OSError as e:
+            logger.error(f"Failed to write capture summary {capture.id}: {e}")
+
+    def file_path(self, capture_id: str, name: str) -> Optional[str]:
+        """Path of a capture output file, or None if invalid or missing."""
+        if not VALID_CAPTURE_ID.match(capture_id) or not VALID_FILE_NAME.match(name):
+            return None
+        path = os.path.join(settings.profiling.directory, capture_id, name)
+        return path if os.path.isfile(path) else None
+
+    # Slow callback watchdog
+
+    def _watching(self) -> bool:
+        return self.armed or bool(self._active)
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        if self._watching():
+            self._loop.call_later(settings.profiling.slow_callback_ms / 2000, self._beat)
+        else:
+            self._watch_stop.set()
+            self._watch_stop = None
+
+    def _start_watchdog(self):
+        if self._watch_stop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._watch_stop = threading.Event()
+        self._loop.call_soon(self._beat)
+        threading.Thread(target=self._watch, args=(self._watch_stop,), name="profiler-watchdog", daemon=True).start()
+
+    def _watch(self, stop: threading.Event):
+        """Runs in a thread: report when the loop hasn't run the heartbeat for too long."""
+        threshold = settings.profiling.slow_callback_ms / 1000
+        beat_interval = threshold / 2
+        event: Optional[Dict[str, Any]] = None
+        event_beat = None
+        while not stop.wait(beat_interval / 2):
+            last = self._last_beat
+            blocked = time.monotonic() - last - beat_interval
+            if blocked < threshold:
+                continue
+            if event is not None and event_beat == last:
+                event["blocked_ms"] = round(blocked * 1000) # Still blocked
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            event = {"at": datetime.utcnow().isoformat(), "blocked_ms": round(blocked * 1000), "stack": _running_stack(frame)}
+            event_beat = last
+            logger.warning(f"Event loop blocked for over {blocked * 1000:.0f}ms in {event['stack'].rsplit(';', 1)[-1]}")
+            targets = {profile.capture.id: profile.capture for profile in list(self._active)}
+            targets.update((c.id, c) for c in list(self._captures.values()) if c.armed)
+            for capture in targets.values():
+                if len(capture.slow_callbacks) < MAX_SLOW_CALLBACKS:
+                    capture.slow_callbacks.append(event)
+
+profiler = Profiler()
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def _query_param(scope: Scope, name: str) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+    return values[0] if values else None
+
+async def _read_project_from_body(receive: Receive) -> Tuple[Optional[str], Receive]:
+    """Read a JSON body's `project_id`, returning a `receive` that replays the body."""
+    messages: List[Message] = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            break
+
+    project_id = None
+    try:
+        data = json.loads(b"".join(m.get("body", b"") for m in messages if m["type"] == "http.request"))
+        if isinstance(data, dict) and isinstance(data.get("project_id"), str):
+            project_id = data["project_id"]
+    except ValueError:
+        pass
+
+    async def replay() -> Message:
+        return messages.pop(0) if messages else await receive()
+    return project_id, replay
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI hook starting the profiler for requests matching an armed capture, or
+    sent by an admin with `X-Profile: 1`. When nothing is armed a request costs one
+    flag check and a header lookup. Must run after AuthMiddleware (admin check).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _is_admin(self, scope: Scope) -> bool:
+        user = scope.get("state", {}).get("user") or {}
+        return user.get("email") in settings.auth.admin_emails
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        capture = None
+        if profiler.armed:
+            path = scope["path"]
+            project_id = _query_param(scope, "project_id") or _header(scope, b"x-project-id")
+            if project_id is None and scope["method"] in ("POST", "PUT", "PATCH") and profiler.needs_project(path):
+                project_id, receive = await _read_project_from_body(receive)
+            capture = profiler.claim(path, project_id)
+        if capture is None and _header(scope, PROFILE_HEADER) and self._is_admin(scope) and profiler.supported():
+            capture = profiler.adhoc()
+
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start(capture, scope)
+        token = _current_profile.set(profile)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (CAPTURE_HEADER, capture.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            profiler.finish(profile, status_code)
+
+_ROOT_CODES.add(ProfilingMiddleware.__call__.__code__)
@@ -1,6 +1,194 @@
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 
-# Global Limiter instance
-limiter = Limiter(key_func=get_remote_address)
+from fastapi import HTTPException, Request, Response, status
+from redis.exceptions import RedisError
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.infrastructure.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+# Sliding window counter: the previous window's count is weighted by how much of it
+# still overlaps the sliding window. Requests admitted locally since the last sync
+# (`pending`) are added first, then the current request, worth `cost`, is checked.
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local pending = tonumber(ARGV[4])
+local cost = tonumber(ARGV[5])
+
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weight = (window - (now % window)) / window
+
+if pending > 0 then
+    current = redis.call('INCRBY', KEYS[1], pending)
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+
+local estimated = previous * weight + current
+if estimated + cost > limit then
+    return {0, math.ceil(estimated)}
+end
+
+current = redis.call('INCRBY', KEYS[1], cost)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.ceil(previous * weight + current)}
+"""
+
+UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_limit(spec: str) -> Tuple[int, int]:
+    """Parse "60/minute" into (60, 60 seconds)."""
+    count, _, unit = spec.partition("/")
+    unit = unit.strip().lower().rstrip("s")
+    if unit not in UNITS:
+        raise ValueError(f"Invalid rate limit: {spec}")
+    return int(count), UNITS[unit]
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int # Seconds until the current window ends
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_after),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.reset_after)
+        return headers
+
+@dataclass
+class _LocalState:
+    window_id: int
+    count: int = 0 # Global count seen at the last sync
+    pending: int = 0 # Admitted locally, not yet sent to Redis
+    synced: bool = False
+    # One Redis sync per key at a time, so the same pending admissions are never flushed twice
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+class RateLimiter:
+    """
+    Distributed sliding-window rate limiter backed by Redis.
+    Limits are keyed by JWT subject and project (client IP alone when unauthenticated),
+    and configured per route in `settings.rate_limit`. A local pre-check admits requests
+    without a Redis call while the last known count is well under the limit; those
+    are flushed to Redis with the next synced call. If Redis is unavailable, requests
+    are allowed.
+    """
+
+    def __init__(self, max_local_keys: int = 10000):
+        self.max_local_keys = max_local_keys
+        self._local: OrderedDict[str, _LocalState] = OrderedDict()
+        self._script = None
+
+    def _limit_for(self, route: str) -> Tuple[int, int]:
+        return parse_limit(getattr(settings.rate_limit, route))
+
+    def key_for(self, route: str, request: Request, project_id: Optional[str] = None) -> str:
+        """
+        The project is never read from the request: a client could send a new one each
+        time to get a fresh limit. It comes from `project_id`, which the route must have
+        validated, or the token's `project_id` claim.
+        """
+        user = getattr(request.state, "user", None) or {}
+        subject = user.get("sub")
+        if not subject:
+            return f"ratelimit:{route}:{request.client.host if request.client else 'unknown'}"
+        project = project_id or user.get("project_id") or "-"
+        return f"ratelimit:{route}:{subject}:{project}"
+
+    def _local_check(self, key: str, limit: int, window_id: int, window: int, now: float, cost: int) -> Optional[RateLimitResult]:
+        state = self._local.get(key)
+        if state is None or state.window_id != window_id or not state.synced:
+            return None
+        admitted = state.count + state.pending + cost
+        if admitted > limit * settings.rate_limit.local_threshold or state.pending >= settings.rate_limit.local_max_pending:
+            return None
+        state.pending += cost
+        self._local.move_to_end(key)
+        return RateLimitResult(True, limit, max(0, limit - admitted), math.ceil(window - now % window))
+
+    async def hit(self, route: str, request: Request, project_id: Optional[str] = None, cost: int = 1) -> RateLimitResult:
+        """Count one request, worth `cost` units, against `route`'s limit."""
+        limit, window = self._limit_for(route)
+        key = self.key_for(route, request, project_id)
+        now = time.time()
+        window_id = int(now // window)
+        reset_after = math.ceil(window - now % window)
+
+        result = self._local_check(key, limit, window_id, window, now, cost)
+        if result is not None:
+            return result
+
+        state = self._local.get(key)
+        if state is None or state.window_id != window_id:
+            state = self._local[key] = _LocalState(window_id=window_id)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_keys:
+            self._local.popitem(last=False)
+
+        async with state.lock:
+            # The sync we waited for may have left room to admit locally
+            result = self._local_check(key, limit, window_id, window, time.time(), cost)
+            if result is not None:
+                return result
+
+            # Requests admitted locally during the call below stay pending for the next sync
+            flushed = state.pending
+            try:
+                if self._script is None:
+                    self._script = redis_manager.client.register_script(SLIDING_WINDOW_LUA)
+                allowed, count = await self._script(
+                    keys=[f"{key}:{window_id}", f"{key}:{window_id - 1}"],
+                    args=[limit, window * 1000, int(now * 1000), flushed, cost],
+                )
+            except RedisError as e:
+                logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+                return RateLimitResult(True, limit, limit, reset_after)
+
+            state.pending -= flushed
+            state.count = int(count)
+            state.synced = True
+        return RateLimitResult(bool(allowed), limit, max(0, limit - int(count)), reset_after)
+
+rate_limiter = RateLimiter()
+
+async def enforce_rate_limit(
+    route: str, request: Request, response: Optional[Response] = None, project_id: Optional[str] = None, cost: int = 1
+) -> RateLimitResult:
+    """
+    Apply `route`'s limit to a request worth `cost` units (e.g. pages rendered). Sets
+    rate-limit headers on `response` and raises 429 when the limit is exceeded.
+    """
+    if not settings.rate_limit.enabled:
+        return RateLimitResult(True, 0, 0, 0)
+
+    result = await rate_limiter.hit(route, request, project_id, cost)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers=result.headers(),
+        )
+    if response is not None:
+        response.headers.update(result.headers())
+    return result
+
+def rate_limit(route: str):
+    """Dependency applying `route`'s limit, keyed by user and token project (client IP when unauthenticated)."""
+    async def dependency(request: Request, response: Response) -> RateLimitResult:
+        return await enforce_rate_limit(route, request, response)
+    return dependency
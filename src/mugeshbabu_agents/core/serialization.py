@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Tuple, Union
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from mugeshbabu_agents.core.config import settings
+
+def _default(obj: Any) -> Any:
+    """Types neither backend encodes natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _stdlib_default(obj: Any) -> Any:
+    # orjson handles these itself
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return _default(obj)
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def _select_backend() -> Tuple[str, Callable[[Any], bytes], Callable[[Union[str, bytes]], Any]]:
+    """
+    orjson when it is installed (and `JSON_BACKEND` allows it), else the stdlib. Both
+    produce the same documents: compact UTF-8, ObjectIds as strings, ISO 8601 datetimes.
+    """
+    if settings.app.json_backend != "json":
+        try:
+            import orjson
+        except ImportError:
+            if settings.app.json_backend == "orjson":
+                raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+        else:
+            options = orjson.OPT_NON_STR_KEYS
+
+            def orjson_dumps(obj: Any) -> bytes:
+                return orjson.dumps(obj, default=_default, option=options)
+
+            return "orjson", orjson_dumps, orjson.loads
+    return "json", _stdlib_dumps, json.loads
+
+# `dumps(obj) -> bytes`; `loads` accepts str or bytes (Redis returns str)
+BACKEND, dumps, loads = _select_backend()
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with `dumps`. Content is encoded as is, so raw documents
+    (ObjectIds, datetimes) can be returned without a `jsonable_encoder` pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -15,8 +15,9 @@ class PyObjectId(ObjectId):
                 core_schema.is_instance_schema(ObjectId),
                 core_schema.no_info_plain_validator_function(cls.validate),
             ]),
+            # Only stringify for JSON so `model_dump()` keeps real ObjectIds for MongoDB
             serialization=core_schema.plain_serializer_function_ser_schema(
-                lambda x: str(x)
+                lambda x: str(x), when_used="json"
             ),
         )
 
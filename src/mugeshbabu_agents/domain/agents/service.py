@@ -1,12 +1,14 @@
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mugeshbabu_agents.core.config import settings
-from mugeshbabu_agents.domain.agents.models import Agent, AgentInstance
+from mugeshbabu_agents.core.metrics import stage_timer
+from mugeshbabu_agents.domain.agents.models import Agent, AgentInstance, MCPConfig
 from mugeshbabu_agents.infrastructure.db import db_manager
 from mugeshbabu_agents.infrastructure.repository import BaseRepository
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec, PROJECT
 
 # Placeholder for AWS integration - in a real app, this would be injected or imported from infrastructure/aws.py
 # using boto3 or aiobotocore
@@ -15,10 +17,17 @@ import asyncio
 logger = logging.getLogger(__name__)
 
 class AgentRepository(BaseRepository[Agent]):
-    pass
+    collection_name = "agents"
+    # Fields commonly used by Team.dynamic_filters
+    indexes = [IndexSpec((("category", 1),), sparse=True)]
 
 class AgentInstanceRepository(BaseRepository[AgentInstance]):
-    pass
+    collection_name = "agent_instances"
+    db_scope = PROJECT
+    indexes = [
+        IndexSpec((("master_agent_id", 1), ("created_at", -1))),
+        IndexSpec((("status", 1), ("created_at", -1))),
+    ]
 
 class AgentService:
     def __init__(self):
@@ -42,20 +51,55 @@ class AgentService:
             mcp_servers=[{"server_name": "github", "auth_config": {"type": "oauth"}}]
         )
 
+    async def _resolve_mcp_server(self, server: MCPConfig, project_id: str) -> Dict[str, Any]:
+        """
+        Resolve a single MCP server, e.g., fetching its token for the project.
+        """
+        # Logic to fetch actual credentials for the project
+        # secret = await self.secrets_manager.get_secret(project_id, server.server_name)
+        return {
+            "url": server.server_url,
+            "token": "mock_token_123" # Placeholder
+        }
+
     async def resolve_mcp_config(self, agent: Agent, project_id: str) -> Dict[str, Any]:
         """
         Resolve MCP server configurations, e.g., fetching tokens from DB.
         """
         resolved_config = {}
         for server in agent.mcp_servers:
-            # Logic to fetch actual credentials for the project
-            # secret = await self.secrets_manager.get_secret(project_id, server.server_name)
-            resolved_config[server.server_name] = {
-                "url": server.server_url,
-                "token": "mock_token_123" # Placeholder
-            }
+            resolved_config[server.server_name] = await self._resolve_mcp_server(server, project_id)
         return resolved_config
 
+    async def resolve_mcp_configs(self, agents: List[Agent], project_id: str, concurrency: int) -> List[Dict[str, Any]]:
+        """
+        Resolve MCP configs for many agents at once.
+        Servers shared between agents (same name and URL) are resolved only once.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        shared: Dict[Tuple[str, Optional[str]], asyncio.Task] = {}
+
+        async def resolve_limited(server: MCPConfig) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._resolve_mcp_server(server, project_id)
+
+        for agent in agents:
+            for server in agent.mcp_servers:
+                key = (server.server_name, server.server_url)
+                if key not in shared:
+                    shared[key] = asyncio.create_task(resolve_limited(server))
+
+        if shared:
+            await asyncio.gather(*shared.values())
+
+        return [
+            {
+                server.server_name: shared[(server.server_name, server.server_url)].result()
+                for server in agent.mcp_servers
+            }
+            for agent in agents
+        ]
+
     async def push_to_sqs(self, message: Dict[str, Any]):
         """
         Push message to AWS SQS.
@@ -69,6 +113,21 @@ class AgentService:
         # In a real async flow, we'd await the actual call
         await asyncio.sleep(0.01)
 
+    async def push_to_sqs_batch(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Push up to `settings.agents.sqs_batch_size` messages to AWS SQS in one call.
+        Returns the instance ids of the entries that failed.
+        """
+        # async with session.create_client('sqs', region_name=settings.aws.region) as client:
+        #     response = await client.send_message_batch(
+        #         QueueUrl=settings.aws.sqs_queue_url,
+        #         Entries=[{"Id": m["instance_id"], "MessageBody": json.dumps(m)} for m in messages]
+        #     )
+        #     return [entry["Id"] for entry in response.get("Failed", [])]
+        logger.info(f"MOCK SQS BATCH PUSH: {len(messages)} messages ({', '.join(m['instance_id'] for m in messages)})")
+        await asyncio.sleep(0.01)
+        return []
+
     async def execute_agent(self, master_agent_id: str, project_id: str, input_data: Dict[str, Any], user_token: Optional[str] = None) -> AgentInstance:
         """
         Main entry point to execute an agent.
@@ -95,10 +154,12 @@ class AgentService:
         # Save to Project-specific DB using Repository
         project_db = db_manager.get_project_db(project_id)
         repo = AgentInstanceRepository(project_db, "agent_instances", AgentInstance)
-        instance = await repo.create(instance)
+        with stage_timer("execute_agent", "insert"):
+            instance = await repo.create(instance)
 
         # 3. Resolve MCP Configs
-        mcp_config = await self.resolve_mcp_config(agent, project_id)
+        with stage_timer("execute_agent", "resolve"):
+            mcp_config = await self.resolve_mcp_config(agent, project_id)
 
         # 4. Construct SQS Message
         sqs_message = {
@@ -113,18 +174,120 @@ class AgentService:
 
         # 5. Push to Queue
         try:
-            await self.push_to_sqs(sqs_message)
-            
-            # Update status to QUEUED if needed, or keep as PENDING
+            with stage_timer("execute_agent", "queue"):
+                await self.push_to_sqs(sqs_message)
+
             # Update status to QUEUED if needed, or keep as PENDING
-            await repo.update(instance.id, {"status": "QUEUED", "updated_at": datetime.utcnow()})
+            with stage_timer("execute_agent", "update"):
+                await repo.update(instance.id, {"status": "QUEUED", "updated_at": datetime.utcnow()}, projection={"_id": 1})
             instance.status = "QUEUED"
         except Exception as e:
             logger.error(f"Failed to push to SQS: {e}")
-            await repo.update(instance.id, {"status": "FAILED", "result": {"error": str(e)}, "updated_at": datetime.utcnow()})
+            await repo.update(
+                instance.id,
+                {"status": "FAILED", "result": {"error": str(e)}, "updated_at": datetime.utcnow()},
+                projection={"_id": 1}
+            )
             instance.status = "FAILED"
             raise e
 
         return instance
 
+    async def execute_agents(
+        self,
+        agents: List[Agent],
+        project_id: str,
+        input_data: Dict[str, Any],
+        user_token: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ) -> List[AgentInstance]:
+        """
+        Fan out one execution per agent.
+        1. Create all Instances in DB (single insert_many)
+        2. Resolve Configs (shared across agents)
+        3. Push to SQS in batches, at most `concurrency` batches in flight
+        4. Mark instances QUEUED / FAILED with their error (one update_many per status and error)
+        """
+        if not agents:
+            return []
+
+        concurrency = concurrency or settings.agents.team_fanout_concurrency
+        logger.info(f"Fanning out {len(agents)} agents for project {project_id} (concurrency={concurrency})")
+
+        # 1. Create Agent Instances
+        instances = [
+            AgentInstance(
+                master_agent_id=str(agent.id),
+                project_id=project_id,
+                input_data=input_data,
+                status="PENDING"
+            )
+            for agent in agents
+        ]
+        project_db = db_manager.get_project_db(project_id)
+        repo = AgentInstanceRepository(project_db, "agent_instances", AgentInstance)
+        instances = await repo.create_many(instances)
+
+        # 2. Resolve MCP Configs
+        mcp_configs = await self.resolve_mcp_configs(agents, project_id, concurrency)
+
+        # 3. Construct SQS Messages and push them in batches
+        timestamp = datetime.utcnow().isoformat()
+        messages = [
+            {
+                "instance_id": str(instance.id),
+                "project_id": project_id,
+                "prompt_id": instance.master_agent_id,
+                "prompt_inputs": input_data,
+                "mcp_config": mcp_config,
+                "callback_auth": user_token,
+                "timestamp": timestamp
+            }
+            for instance, mcp_config in zip(instances, mcp_configs)
+        ]
+
+        batch_size = settings.agents.sqs_batch_size
+        batches = [messages[i:i + batch_size] for i in range(0, len(messages), batch_size)]
+        semaphore = asyncio.Semaphore(concurrency)
+        errors: Dict[str, str] = {}
+
+        async def push_batch(batch: List[Dict[str, Any]]):
+            async with semaphore:
+                try:
+                    for instance_id in await self.push_to_sqs_batch(batch):
+                        logger.error(f"SQS rejected message for instance {instance_id}")
+                        errors[instance_id] = "Rejected by queue"
+                except Exception as e:
+                    logger.error(f"Failed to push SQS batch: {e}")
+                    for message in batch:
+                        errors[message["instance_id"]] = str(e)
+
+        await asyncio.gather(*(push_batch(batch) for batch in batches))
+
+        # 4. Update statuses
+        now = datetime.utcnow()
+        queued_ids = [instance.id for instance in instances if str(instance.id) not in errors]
+        failed_ids = [instance.id for instance in instances if str(instance.id) in errors]
+        if queued_ids:
+            await repo.update_many({"_id": {"$in": queued_ids}}, {"status": "QUEUED", "updated_at": now})
+        # One update per distinct error (a failed batch shares its error)
+        failed_by_error: Dict[str, List[Any]] = {}
+        for instance_id in failed_ids:
+            failed_by_error.setdefault(errors[str(instance_id)], []).append(instance_id)
+        for error, ids in failed_by_error.items():
+            await repo.update_many(
+                {"_id": {"$in": ids}},
+                {"status": "FAILED", "result": {"error": error}, "updated_at": now}
+            )
+
+        for instance in instances:
+            if str(instance.id) in errors:
+                instance.status = "FAILED"
+                instance.result = {"error": errors[str(instance.id)]}
+            else:
+                instance.status = "QUEUED"
+            instance.updated_at = now
+
+        return instances
+
 agent_service = AgentService()
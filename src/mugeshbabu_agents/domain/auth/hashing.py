@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from mugeshbabu_agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasher:
+    """
+    Runs Argon2 hashing/verification on a small dedicated thread pool so it never
+    blocks the event loop (argon2-cffi releases the GIL while hashing).
+    At most `hash_workers + hash_queue_limit` operations are accepted at once;
+    beyond that callers get a fast 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._context = None
+
+    @property
+    def context(self):
+        """The passlib context, built (and passlib/argon2 imported) on first use."""
+        if self._context is None:
+            from passlib.context import CryptContext
+
+            self._context = CryptContext(
+                schemes=["argon2"],
+                deprecated="auto",
+                argon2__time_cost=settings.auth.argon2_time_cost,
+                argon2__memory_cost=settings.auth.argon2_memory_cost,
+                argon2__parallelism=settings.auth.argon2_parallelism,
+            )
+        return self._context
+
+    @property
+    def capacity(self) -> int:
+        return settings.auth.hash_workers + settings.auth.hash_queue_limit
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.auth.hash_workers,
+                thread_name_prefix="argon2"
+            )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.capacity:
+            logger.warning(f"Password hashing saturated ({self._pending} pending), rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is temporarily overloaded, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify, and return a new hash if the stored one uses outdated cost parameters."""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher()
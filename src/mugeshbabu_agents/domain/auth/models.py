@@ -3,6 +3,7 @@ from typing import Optional
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from mugeshbabu_agents.core.types import PyObjectId
 from mugeshbabu_agents.infrastructure.repository import BaseRepository
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec
 
 class User(BaseModel):
     id: Optional[PyObjectId] = Field(None, alias="_id")
@@ -26,6 +27,9 @@ class Token(BaseModel):
     token_type: str
 
 class UserRepository(BaseRepository[User]):
+    collection_name = "users"
+    indexes = [IndexSpec((("email", 1),), unique=True)]
+
     async def get_by_email(self, email: str) -> Optional[User]:
         doc = await self.collection.find_one({"email": email})
         if doc:
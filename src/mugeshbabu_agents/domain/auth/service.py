@@ -1,24 +1,21 @@
 import jwt
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from mugeshbabu_agents.core.config import settings
 from mugeshbabu_agents.infrastructure.db import db_manager
 from mugeshbabu_agents.domain.auth.models import User, UserCreate, UserLogin, Token, UserRepository
-
-# Password Context
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from mugeshbabu_agents.domain.auth.hashing import password_hasher
 
 class AuthService:
     def __init__(self):
         # We'll initialize repository on demand
         pass
 
-    def verify_password(self, plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password, hashed_password):
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password):
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password):
+        return await password_hasher.hash(password)
 
     def create_access_token(self, data: dict, expires_delta: timedelta | None = None):
         to_encode = data.copy()
@@ -44,7 +41,7 @@ class AuthService:
             )
 
         # 2. Create User
-        hashed_password = self.get_password_hash(user_in.password)
+        hashed_password = await self.get_password_hash(user_in.password)
         new_user = User(
             email=user_in.email,
             hashed_password=hashed_password
@@ -66,13 +63,20 @@ class AuthService:
 
         # 1. Authenticate User
         user = await repo.get_by_email(user_in.email)
-        if not user or not self.verify_password(user_in.password, user.hashed_password):
+        verified, new_hash = False, None
+        if user:
+            verified, new_hash = await password_hasher.verify_and_update(user_in.password, user.hashed_password)
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        # Re-hash with the current Argon2 parameters if they changed
+        if new_hash:
+            await repo.update(user.id, {"hashed_password": new_hash}, projection={"_id": 1})
+
         # 2. Create Token
         access_token_expires = timedelta(minutes=settings.auth.access_token_expire_minutes)
         access_token = self.create_access_token(
@@ -1,34 +1,44 @@
-import json
 import logging
+from datetime import datetime
 from typing import List, Optional
 import httpx
-from bs4 import BeautifulSoup
-from rank_bm25 import BM25Okapi
-import redis.asyncio as redis
 from bson import ObjectId
 
 from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.metrics import record_cache, stage_timer
+from mugeshbabu_agents.core import serialization
 from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.redis_client import redis_manager
 from mugeshbabu_agents.domain.chat.models import Conversation, Message, ChatResponse
 
-from mugeshbabu_agents.infrastructure.repository import BaseRepository
+from mugeshbabu_agents.infrastructure.repository import BaseRepository, Update
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec
 
 logger = logging.getLogger(__name__)
 
 class ConversationRepository(BaseRepository[Conversation]):
-    pass
+    collection_name = "mb_t_conversations"
+    indexes = [IndexSpec((("project_id", 1), ("updated_at", -1)))]
 
 class ChatService:
-    def __init__(self):
-        self.redis = redis.from_url(settings.redis.url, encoding="utf-8", decode_responses=True)
-        # In a real app, initialize AWS Bedrock client here
-        # self.bedrock = boto3.client("bedrock-runtime", region_name=settings.aws.region)
+    # In a real app, initialize AWS Bedrock client here (lazily, like the Redis client)
+    # self.bedrock = boto3.client("bedrock-runtime", region_name=settings.aws.region)
+
+    @property
+    def redis(self):
+        """The shared client, so no connection pool is built at import time."""
+        return redis_manager.client
 
     async def _fetch_and_parse_url(self, url: str) -> str:
         """Fetch HTML from URL and extract text."""
         async with httpx.AsyncClient() as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
+            with stage_timer("chat", "fetch"):
+                resp = await client.get(url)
+                resp.raise_for_status()
+        # Imported on first use, bs4 is slow to import and only chat needs it
+        from bs4 import BeautifulSoup
+
+        with stage_timer("chat", "parse"):
             soup = BeautifulSoup(resp.content, "html.parser")
             # Remove scripts and styles
             for script in soup(["script", "style"]):
@@ -62,18 +72,20 @@ class ChatService:
     async def _get_or_create_chunks(self, url: str) -> List[str]:
         """Check Redis for chunks, else fetch and process."""
         cache_key = f"doc_chunks:{url}"
-        cached = await self.redis.get(cache_key)
-        
+        with stage_timer("chat", "chunk_lookup"):
+            cached = await self.redis.get(cache_key)
+        record_cache("doc_chunks", hit=bool(cached))
+
         if cached:
             logger.info(f"Cache hit for {url}")
-            return json.loads(cached)
+            return serialization.loads(cached)
         
         logger.info(f"Cache miss for {url}. Fetching and processing.")
         text = await self._fetch_and_parse_url(url)
         chunks = self._chunk_text(text)
         
         # Cache for 24h
-        await self.redis.setex(cache_key, 86400, json.dumps(chunks))
+        await self.redis.setex(cache_key, 86400, serialization.dumps(chunks))
         return chunks
 
     def _retrieve_context(self, query: str, chunks: List[str], top_k: int = 3) -> List[str]:
@@ -81,6 +93,9 @@ class ChatService:
         if not chunks:
             return []
             
+        # rank_bm25 pulls in numpy, keep it off the startup path
+        from rank_bm25 import BM25Okapi
+
         tokenized_corpus = [chunk.split(" ") for chunk in chunks]
         bm25 = BM25Okapi(tokenized_corpus)
         tokenized_query = query.split(" ")
@@ -116,11 +131,12 @@ class ChatService:
         # Re-reading prompt: "Save Q&A pair to mb_t_conversations in Mongo"
         # Prompt said `mb_t_conversations`. I'll use that collection name.
         
-        # 1. Get Conversation or Create New
+        # 1. Get Conversation or start a new one (it is only written once, in step 6)
         repo = ConversationRepository(db, "mb_t_conversations", Conversation)
         
         if conversation_id:
-            conversation = await repo.get(conversation_id)
+            with stage_timer("chat", "conversation_load"):
+                conversation = await repo.get(conversation_id)
             if not conversation:
                 raise ValueError("Conversation not found")
         else:
@@ -129,28 +145,34 @@ class ChatService:
                 document_url=document_url,
                 messages=[]
             )
-            conversation = await repo.create(conversation)
 
         # 2. Get Chunks (Cache/Process)
         chunks = await self._get_or_create_chunks(document_url)
 
         # 3. Retrieve Context
-        relevant_chunks = self._retrieve_context(question, chunks)
+        with stage_timer("chat", "retrieve"):
+            relevant_chunks = self._retrieve_context(question, chunks)
 
         # 4. Generate Answer
-        answer_text = await self._generate_response(question, relevant_chunks, conversation.messages)
+        with stage_timer("chat", "generate"):
+            answer_text = await self._generate_response(question, relevant_chunks, conversation.messages)
 
         # 5. Update History
         user_msg = Message(role="user", content=question)
         assistant_msg = Message(role="assistant", content=answer_text)
-        
-        conversation.messages.append(user_msg)
-        conversation.messages.append(assistant_msg)
-        conversation.updated_at = datetime.utcnow()
 
-        # 6. Save to DB
-        # 6. Save to DB
-        await repo.update(conversation.id, conversation.model_dump(by_alias=True, exclude={"id"}))
+        # 6. Save to DB: append the Q&A pair atomically, creating the conversation if new
+        update = (
+            Update()
+            .set(updated_at=datetime.utcnow())
+            .push("messages", user_msg.model_dump(), assistant_msg.model_dump(), slice=-settings.chat.max_history_messages)
+        )
+        with stage_timer("chat", "save"):
+            if conversation_id:
+                await repo.update_ops(conversation.id, update, projection={"_id": 1})
+            else:
+                update.set_on_insert(project_id=project_id, document_url=document_url, created_at=conversation.created_at)
+                await repo.upsert(conversation.id, update, projection={"_id": 1})
 
         return ChatResponse(
             answer=answer_text,
@@ -0,0 +1,41 @@
+import logging
+from typing import Optional
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.domain.documents.models import ArtifactGrant
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec
+from mugeshbabu_agents.infrastructure.repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+class ArtifactGrantRepository(BaseRepository[ArtifactGrant]):
+    collection_name = "artifact_grants"
+    indexes = [
+        # Grants outlive their artifact by at most the artifact TTL
+        IndexSpec((("created_at", 1),), expire_after_seconds=settings.artifacts.ttl_seconds or None),
+    ]
+
+class ArtifactAccessService:
+    """
+    Who may download which stored artifact. Artifacts are named by content hash and
+    shared between users through the PDF cache, so the name alone proves nothing: a
+    user is granted an artifact when a job or bundle of theirs produces (or is served)
+    it, and `GET /documents/artifacts/{name}` requires that grant.
+    """
+
+    def _repo(self) -> ArtifactGrantRepository:
+        return ArtifactGrantRepository(db_manager.get_master_db(), "artifact_grants", ArtifactGrant)
+
+    async def grant(self, user_id: Optional[str], artifact_name: str):
+        if not user_id:
+            return
+        grant = ArtifactGrant(_id=f"{user_id}:{artifact_name}", user_id=user_id, artifact_name=artifact_name)
+        await self._repo().collection.replace_one({"_id": grant.id}, grant.model_dump(by_alias=True), upsert=True)
+
+    async def allowed(self, user_id: Optional[str], artifact_name: str) -> bool:
+        if not user_id:
+            return False
+        return await self._repo().collection.find_one({"_id": f"{user_id}:{artifact_name}"}, {"_id": 1}) is not None
+
+artifact_access = ArtifactAccessService()
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    # Playwright is imported when the first browser is launched
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright, Request
+
+logger = logging.getLogger(__name__)
+
+class BrowserPoolBusyError(Exception):
+    """Raised when no browser context could be acquired (queue full or timed out)."""
+
+@dataclass
+class PooledContext:
+    context: "BrowserContext"
+    page: "Page"
+    generation: int # Browser generation the context belongs to
+    renders: int = 0
+    origins: Set[str] = field(default_factory=set) # Origins requested since the last reset
+
+    def _on_request(self, request: "Request"):
+        parts = urlsplit(request.url)
+        if parts.scheme in ("http", "https"):
+            self.origins.add(f"{parts.scheme}://{parts.netloc}")
+
+class BrowserPool:
+    """
+    Pool of warm, reusable Playwright contexts (one page each) on a shared browser.
+
+    At most `size` renders run at once; up to `max_waiters` callers wait for a free
+    context, for at most `acquire_timeout` seconds. Contexts are reset between uses and
+    recycled after `max_renders` renders to contain leaks. A reset leaves nothing
+    from one render visible to the next (they may belong to different tenants): the page
+    is replaced, which drops its routes and sessionStorage, and every origin the render
+    touched has its cookies, storage, IndexedDB, caches and service workers cleared, along
+    with the HTTP cache and granted permissions. If the browser crashes, it is
+    relaunched on the next acquire and contexts from the dead browser are dropped.
+    """
+
+    def __init__(self, size: int, max_renders: int, acquire_timeout: float, max_waiters: int):
+        self.size = size
+        self.max_renders = max_renders
+        self.acquire_timeout = acquire_timeout
+        self.max_waiters = max_waiters
+
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._generation = 0
+        self._launch_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[PooledContext] = []
+        self._waiting = 0
+        self._in_use = 0
+
+        self._renders = 0
+        self._created = 0
+        self._recycled = 0
+        self._restarts = 0
+        self._rejected = 0
+
+    async def _get_browser(self) -> "Browser":
+        """Launch the browser if needed (first use or after a crash)."""
+        if self._browser and self._browser.is_connected():
+            return self._browser
+
+        async with self._launch_lock:
+            if self._browser and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                logger.warning("Playwright browser disconnected, relaunching...")
+                self._restarts += 1
+            logger.info("Launching Playwright Browser...")
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._browser.on("disconnected", self._on_disconnected)
+            self._generation += 1
+            return self._browser
+
+    def _on_disconnected(self, browser: "Browser"):
+        if browser is self._browser:
+            # Invalidate every context of this browser
+            self._generation += 1
+
+    async def _new_context(self) -> PooledContext:
+        browser = await self._get_browser()
+        context = await browser.new_context()
+        page = await context.new_page()
+        self._created += 1
+        pooled = PooledContext(context=context, page=page, generation=self._generation)
+        context.on("request", pooled._on_request)
+        return pooled
+
+    async def _discard(self, pooled: PooledContext):
+        self._recycled += 1
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing browser context: {e}")
+
+    async def _reset(self, pooled: PooledContext) -> bool:
+        """Clear state left by the previous render. Returns False if the context is unusable."""
+        try:
+            page = await pooled.context.new_page()
+            await pooled.page.close()
+            pooled.page = page
+
+            cdp = await pooled.context.new_cdp_session(page)
+            try:
+                for origin in pooled.origins:
+                    # "all" covers cookies, local storage, IndexedDB, Cache Storage and service workers
+                    await cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                await cdp.send("Network.clearBrowserCache")
+            finally:
+                await cdp.detach()
+            pooled.origins.clear()
+            await pooled.context.clear_cookies()
+            await pooled.context.clear_permissions()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset browser context, recycling it: {e}")
+            return False
+
+    async def acquire(self) -> PooledContext:
+        if self._waiting >= self.max_waiters:
+            self._rejected += 1
+            raise BrowserPoolBusyError("PDF render queue is full")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise BrowserPoolBusyError("Timed out waiting for a PDF renderer")
+        finally:
+            self._waiting -= 1
+
+        try:
+            while self._idle:
+                pooled = self._idle.pop()
+                if pooled.generation == self._generation:
+                    break
+                await self._discard(pooled)
+            else:
+                pooled = await self._new_context()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self._in_use += 1
+        return pooled
+
+    async def release(self, pooled: PooledContext, discard: bool = False):
+        self._in_use -= 1
+        pooled.renders += 1
+        self._renders += 1
+        try:
+            if (
+                discard
+                or pooled.renders >= self.max_renders
+                or pooled.generation != self._generation
+                or not await self._reset(pooled)
+            ):
+                await self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        """Borrow a page for one render."""
+        pooled = await self.acquire()
+        failed = False
+        try:
+            yield pooled.page
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # A failed render may leave the page in any state; don't reuse it
+            await self.release(pooled, discard=failed)
+
+    async def start(self, warm: bool = False):
+        """Launch the browser now and optionally pre-create every context."""
+        await self._get_browser()
+        if warm:
+            contexts = await asyncio.gather(*(self._new_context() for _ in range(self.size - len(self._idle))))
+            self._idle.extend(contexts)
+
+    async def close(self):
+        """Cleanup browser resources."""
+        for pooled in self._idle:
+            await self._discard(pooled)
+        self._idle = []
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser: {e}")
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "browser_connected": bool(self._browser and self._browser.is_connected()),
+            "renders": self._renders,
+            "contexts_created": self._created,
+            "contexts_recycled": self._recycled,
+            "browser_restarts": self._restarts,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import io
+import logging
+from typing import List, Optional, Tuple, Union
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.domain.documents.models import BundlePage, BundlePageResult, BundleRequest, BundleResult
+from mugeshbabu_agents.domain.documents.pdf_service import PDFArtifact, pdf_service
+from mugeshbabu_agents.domain.documents.renderer import get_profile
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+
+logger = logging.getLogger(__name__)
+
+class BundleError(Exception):
+    """Raised when no page of a bundle could be produced."""
+
+    def __init__(self, pages: List[BundlePageResult]):
+        super().__init__("No page of the bundle could be rendered")
+        self.pages = pages
+
+class BundleService:
+    """
+    Report bundles: render several URLs in parallel through PDFService (so the cache,
+    browser pool and render workers apply) and merge them, in request order, into one
+    PDF with a bookmark per page. Failed pages are reported and left out.
+    """
+
+    async def _render_page(
+        self, index: int, page: BundlePage, profile: Optional[str], semaphore: asyncio.Semaphore
+    ) -> Tuple[BundlePageResult, Optional[PDFArtifact]]:
+        async with semaphore:
+            try:
+                artifact = await asyncio.wait_for(
+                    pdf_service.generate_pdf(page.url, profile=profile),
+                    settings.pdf.job_timeout_seconds
+                )
+                return BundlePageResult(index=index, url=page.url, ok=True), artifact
+            except asyncio.TimeoutError:
+                error = f"Timed out after {settings.pdf.job_timeout_seconds:g}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        logger.warning(f"Bundle page {index} ({page.url}) failed: {error}")
+        return BundlePageResult(index=index, url=page.url, ok=False, error=error), None
+
+    def _merge(self, parts: List[Tuple[BundlePageResult, Optional[str], Union[str, io.BytesIO]]]) -> bytes:
+        """Append each part to one document. Runs in a thread; unreadable parts are marked failed."""
+        from pypdf import PdfReader, PdfWriter
+
+        writer = PdfWriter()
+        for result, title, source in parts:
+            try:
+                reader = PdfReader(source)
+                writer.append(reader, outline_item=title)
+                result.page_count = len(reader.pages)
+            except Exception as e:
+                logger.warning(f"Bundle page {result.index} ({result.url}) could not be merged: {e}")
+                result.ok = False
+                result.error = f"Invalid PDF: {e}"
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    async def build(self, request: BundleRequest) -> Tuple[BundleResult, PDFArtifact]:
+        """Render and merge a bundle. Raises BundleError if every page failed."""
+        if len(request.pages) > settings.pdf.bundle_max_pages:
+            raise ValueError(f"A bundle can have at most {settings.pdf.bundle_max_pages} pages")
+        get_profile(request.profile)
+
+        # A request may lower the configured concurrency, not raise it
+        semaphore = asyncio.Semaphore(min(request.concurrency or settings.pdf.bundle_concurrency, settings.pdf.bundle_concurrency))
+        rendered = await asyncio.gather(*(
+            self._render_page(index, page, request.profile, semaphore)
+            for index, page in enumerate(request.pages)
+        ))
+        results = [result for result, _ in rendered]
+
+        parts = []
+        for (result, artifact), page in zip(rendered, request.pages):
+            if artifact is None:
+                continue
+            title = (page.title or page.url) if request.bookmarks else None
+            source = io.BytesIO(artifact.content) if artifact.content is not None else artifact.path
+            parts.append((result, title, source))
+        if not parts:
+            raise BundleError(results)
+
+        merged = await asyncio.to_thread(self._merge, parts)
+        if not any(result.ok for result in results):
+            raise BundleError(results)
+
+        artifact = PDFArtifact(digest=hashlib.sha256(merged).hexdigest(), size=len(merged), content=merged)
+        artifact.path = await artifact_store.put(artifact.name, merged)
+        failed = sum(not result.ok for result in results)
+        logger.info(f"Bundle merged: {len(results) - failed}/{len(results)} pages, {artifact.size} bytes")
+
+        return BundleResult(
+            artifact_name=artifact.name,
+            size=artifact.size,
+            page_count=sum(result.page_count for result in results),
+            pages=results,
+        ), artifact
+
+bundle_service = BundleService()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional, Union
+from bson import ObjectId
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.domain.documents.access import artifact_access
+from mugeshbabu_agents.domain.documents.models import PDFJob
+from mugeshbabu_agents.domain.documents.pdf_service import PDFArtifact, PDFStream, pdf_service
+from mugeshbabu_agents.domain.documents.renderer import get_profile
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec
+from mugeshbabu_agents.infrastructure.repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["QUEUED", "RUNNING"]
+
+# Extra time before an active job nobody is running is reported as failed
+ORPHAN_GRACE_SECONDS = 60
+
+class PDFJobRepository(BaseRepository[PDFJob]):
+    collection_name = "pdf_jobs"
+    indexes = [
+        IndexSpec((("user_id", 1), ("created_at", -1))),
+        IndexSpec((("created_at", 1),), expire_after_seconds=settings.pdf.job_retention_seconds),
+    ]
+
+class PDFJobService:
+    """
+    PDF generation jobs with a durable record in `pdf_jobs`.
+
+    Jobs run as tasks on the instance that accepted them (rendering itself goes to the
+    render worker processes when enabled). Each job has a timeout and can be cancelled.
+    Only the job's record is shared between instances: a cancel on another instance
+    marks the record, and an active job past its timeout that no instance is running
+    (e.g. after a restart) is reported as failed.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _repo(self) -> PDFJobRepository:
+        return PDFJobRepository(db_manager.get_master_db(), "pdf_jobs", PDFJob)
+
+    async def _finish(self, job: PDFJob, status: str, artifact: Optional[PDFArtifact] = None, error: Optional[str] = None):
+        """Record the outcome, unless the job was already finished (e.g. cancelled elsewhere)."""
+        update = {"status": status, "error": error, "finished_at": datetime.utcnow()}
+        if artifact is not None:
+            update.update(artifact_name=artifact.name, size=artifact.size)
+            await artifact_access.grant(job.user_id, artifact.name)
+        await self._repo().update_many({"_id": job.id, "status": {"$in": ACTIVE_STATUSES}}, update)
+        logger.info(f"PDF job {job.id} {status.lower()}{f': {error}' if error else ''}")
+
+    async def _track_stream(self, job: PDFJob, stream: PDFStream, deadline: float) -> AsyncIterator[bytes]:
+        """
+        Relay a direct download, finishing the job when it completes. The first chunk
+        must arrive by the job's deadline (event loop time), then each next one within
+        `settings.pdf.stream_idle_timeout_seconds`. The transfer as a whole isn't bounded,
+        so large files to slow clients aren't cut off; time spent sending doesn't count.
+        """
+        chunks = stream.chunks
+        idle_timeout = settings.pdf.stream_idle_timeout_seconds
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+                deadline = loop.time() + idle_timeout
+        except asyncio.TimeoutError:
+            await self._finish(job, "FAILED", error="Timed out waiting for the source")
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # GeneratorExit: the response was closed before the body was fully sent
+            await self._finish(job, "CANCELLED", error="Client disconnected")
+            raise
+        except BaseException as e:
+            await self._finish(job, "FAILED", error=str(e) or type(e).__name__)
+            raise
+        finally:
+            await chunks.aclose()
+        await self._finish(job, "SUCCEEDED", artifact=stream.artifact)
+
+    async def _run(self, job: PDFJob, stream: bool) -> Union[PDFArtifact, PDFStream]:
+        await self._repo().update_many(
+            {"_id": job.id, "status": "QUEUED"},
+            {"status": "RUNNING", "started_at": datetime.utcnow()}
+        )
+        deadline = asyncio.get_running_loop().time() + job.timeout_seconds
+        try:
+            result = await asyncio.wait_for(
+                pdf_service.generate_pdf(job.url, stream=stream, profile=job.profile, timeout=job.timeout_seconds),
+                job.timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            await self._finish(job, "FAILED", error=f"Timed out after {job.timeout_seconds:g}s")
+            raise
+        except asyncio.CancelledError:
+            await self._finish(job, "CANCELLED")
+            raise
+        except Exception as e:
+            await self._finish(job, "FAILED", error=str(e) or type(e).__name__)
+            raise
+
+        if isinstance(result, PDFStream):
+            result.chunks = self._track_stream(job, result, deadline)
+        else:
+            await self._finish(job, "SUCCEEDED", artifact=result)
+        return result
+
+    def _start(self, job: PDFJob, stream: bool) -> asyncio.Task:
+        key = str(job.id)
+        task = asyncio.create_task(self._run(job, stream))
+        self._tasks[key] = task
+
+        def done(task: asyncio.Task):
+            self._tasks.pop(key, None)
+            if not task.cancelled():
+                task.exception() # Recorded on the job; don't warn about it being unretrieved
+
+        task.add_done_callback(done)
+        return task
+
+    async def _create(self, url: str, user_id: Optional[str], profile: Optional[str], timeout_seconds: Optional[float]) -> PDFJob:
+        get_profile(profile) # Reject unknown profiles before recording the job
+        job = PDFJob(url=url, profile=profile, user_id=user_id, timeout_seconds=timeout_seconds or settings.pdf.job_timeout_seconds)
+        return await self._repo().create(job)
+
+    async def submit(
+        self, url: str, user_id: Optional[str], profile: Optional[str] = None, timeout_seconds: Optional[float] = None
+    ) -> PDFJob:
+        """Create a job and start it in the background."""
+        job = await self._create(url, user_id, profile, timeout_seconds)
+        self._start(job, stream=False)
+        return job
+
+    async def run(
+        self, url: str, user_id: Optional[str], profile: Optional[str] = None, timeout_seconds: Optional[float] = None
+    ) -> Union[PDFArtifact, PDFStream]:
+        """
+        Create a job and wait for its result (used by the synchronous endpoint).
+        Direct PDF downloads are returned as a stream; the job finishes when it is relayed.
+        """
+        job = await self._create(url, user_id, profile, timeout_seconds)
+        return await self._start(job, stream=True)
+
+    async def get(self, job_id: str, user_id: Optional[str]) -> Optional[PDFJob]:
+        """Get a job owned by `user_id`."""
+        if not ObjectId.is_valid(job_id):
+            return None
+        repo = self._repo()
+        job = await repo.get(job_id, trusted=True)
+        if job is None or job.user_id != user_id:
+            return None
+
+        if job.status in ACTIVE_STATUSES and job_id not in self._tasks:
+            deadline = (job.started_at or job.created_at) + timedelta(seconds=job.timeout_seconds + ORPHAN_GRACE_SECONDS)
+            if datetime.utcnow() > deadline:
+                await self._finish(job, "FAILED", error="Job was interrupted")
+                job = await repo.get(job_id, trusted=True)
+        return job
+
+    async def cancel(self, job_id: str, user_id: Optional[str]) -> Optional[PDFJob]:
+        """Cancel an active job. Finished jobs are returned unchanged."""
+        job = await self.get(job_id, user_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return job
+
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        else:
+            await self._finish(job, "CANCELLED")
+        return await self._repo().get(job_id, trusted=True)
+
+    async def drain(self, timeout: float):
+        """Wait up to `timeout` seconds for jobs running on this instance to finish."""
+        tasks = list(self._tasks.values())
+        if tasks:
+            logger.info(f"Waiting for {len(tasks)} PDF jobs to finish")
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def shutdown(self):
+        """Cancel jobs still running on this instance."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+pdf_job_service = PDFJobService()
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from pydantic import BaseModel, Field, ConfigDict
+from mugeshbabu_agents.core.types import PyObjectId
+
+class PDFRequest(BaseModel):
+    url: str
+    profile: Optional[str] = None # Render profile, defaults to settings.pdf.default_profile
+
+class PDFJobRequest(BaseModel):
+    url: str
+    profile: Optional[str] = None
+    timeout_seconds: Optional[float] = Field(None, gt=0, le=600) # Defaults to settings.pdf.job_timeout_seconds
+
+class PDFJob(BaseModel):
+    """A PDF generation job."""
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    url: str
+    profile: Optional[str] = None
+    user_id: Optional[str] = None # JWT subject of the submitter
+    status: str = "QUEUED" # QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+    timeout_seconds: float
+    artifact_name: Optional[str] = None # Set on success, see GET /documents/artifacts/{name}
+    size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True, json_encoders={ObjectId: str})
+
+class ArtifactGrant(BaseModel):
+    """A user's right to download a stored artifact, keyed by "<user_id>:<artifact_name>"."""
+    id: str = Field(..., alias="_id")
+    user_id: str
+    artifact_name: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class BundlePage(BaseModel):
+    url: str
+    title: Optional[str] = None # Bookmark title, defaults to the URL
+
+class BundleRequest(BaseModel):
+    pages: List[BundlePage] = Field(..., min_length=1)
+    profile: Optional[str] = None
+    bookmarks: bool = True
+    concurrency: Optional[int] = Field(None, ge=1) # Capped at settings.pdf.bundle_concurrency
+    store: bool = False # Store the bundle and return a handle instead of streaming it
+
+class BundlePageResult(BaseModel):
+    index: int
+    url: str
+    ok: bool
+    page_count: int = 0
+    error: Optional[str] = None
+
+class BundleResult(BaseModel):
+    artifact_name: Optional[str] = None # Download with GET /documents/artifacts/{name}
+    size: int = 0
+    page_count: int = 0
+    pages: List[BundlePageResult]
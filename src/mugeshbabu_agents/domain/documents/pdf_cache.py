@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from redis.exceptions import RedisError
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core import serialization
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+from mugeshbabu_agents.infrastructure.http_client import http_client
+from mugeshbabu_agents.infrastructure.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    digest: str # sha256 of the PDF bytes, names the artifact
+    size: int
+    created_at: float
+    etag: Optional[str] = None # Validators of the source URL at render time
+    last_modified: Optional[str] = None
+
+class PDFCache:
+    """
+    PDF result cache.
+
+    Entries map sha256(url + render options) to the sha256 of the resulting PDF and are
+    kept in Redis for `settings.pdf.cache_ttl_seconds`. PDF bytes live in the artifact
+    store under their content hash (`<digest>.pdf`), so identical outputs for different
+    keys are kept once; an evicted artifact is a miss. When the source URL returned an
+    ETag/Last-Modified, hits are revalidated with a conditional HEAD request. If Redis
+    is unavailable the cache is bypassed.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def key_for(url: str, options: Dict[str, Any]) -> str:
+        payload = json.dumps({"url": url, "options": options}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def _load_entry(self, key: str) -> Optional[CacheEntry]:
+        try:
+            raw = await redis_manager.client.get(f"pdfcache:{key}")
+        except RedisError as e:
+            logger.warning(f"PDF cache unavailable: {e}")
+            return None
+        return CacheEntry(**serialization.loads(raw)) if raw else None
+
+    async def _revalidate(self, url: str, entry: CacheEntry) -> bool:
+        """Ask the origin whether the page changed. Errors keep the cached copy."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            resp = await http_client.client.head(url, headers=headers, follow_redirects=True)
+        except httpx.HTTPError as e:
+            logger.warning(f"PDF cache revalidation failed for {url}, serving cached copy: {e}")
+            return True
+
+        if resp.status_code == 304:
+            return True
+        if resp.is_success and entry.etag:
+            return resp.headers.get("etag") == entry.etag
+        return False
+
+    async def get(self, key: str, url: str) -> Optional[Tuple[CacheEntry, str]]:
+        """Return the entry and artifact path for `key`, or None on a miss or when the source changed."""
+        entry = await self._load_entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if settings.pdf.cache_revalidate and (entry.etag or entry.last_modified):
+            if not await self._revalidate(url, entry):
+                logger.info(f"Cached PDF for {url} is outdated")
+                self.invalidated += 1
+                self.misses += 1
+                return None
+
+        path = artifact_store.path(f"{entry.digest}.pdf")
+        if path is None:
+            # Evicted from the artifact store
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry, path
+
+    async def put(self, key: str, digest: str, pdf_bytes: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Record the PDF with sha256 `digest` under `key`, storing it if the artifact store lacks it."""
+        name = f"{digest}.pdf"
+        if not artifact_store.exists(name):
+            await artifact_store.put(name, pdf_bytes)
+        await self.record(key, digest, len(pdf_bytes), etag, last_modified)
+
+    async def record(self, key: str, digest: str, size: int, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Point `key` at an artifact that is already stored."""
+        entry = CacheEntry(digest=digest, size=size, created_at=time.time(), etag=etag, last_modified=last_modified)
+        try:
+            await redis_manager.client.set(f"pdfcache:{key}", serialization.dumps(asdict(entry)), ex=settings.pdf.cache_ttl_seconds)
+        except RedisError as e:
+            logger.warning(f"Failed to record PDF cache entry: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+pdf_cache = PDFCache()
@@ -1,102 +1,247 @@
 import logging
 import asyncio
+import hashlib
+import uuid
 import httpx
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+import aiofiles
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.metrics import STAGE_DURATION, record_cache
+from mugeshbabu_agents.infrastructure.artifact_store import artifact_store
+from mugeshbabu_agents.infrastructure.http_client import http_client
+from mugeshbabu_agents.domain.documents.browser_pool import BrowserPool, BrowserPoolBusyError
+from mugeshbabu_agents.domain.documents.pdf_cache import pdf_cache
+from mugeshbabu_agents.domain.documents.render_farm import render_farm
+from mugeshbabu_agents.domain.documents.renderer import RenderResult, render_options, render_page, source_validators
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class PDFArtifact:
+    digest: str # sha256 of the PDF, also its artifact name (`<digest>.pdf`)
+    size: int
+    content: Optional[bytes] = None # Set when produced by this request
+    path: Optional[str] = None # Set when served from the artifact store
+    timings: Dict[str, float] = field(default_factory=dict) # Stage -> milliseconds
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value for the stage timings."""
+        return ", ".join(f"{stage};dur={ms:.1f}" for stage, ms in self.timings.items())
+
+    @property
+    def name(self) -> str:
+        return f"{self.digest}.pdf"
+
+    async def read(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        async with aiofiles.open(self.path, "rb") as f:
+            return await f.read()
+
+@dataclass
+class PDFStream:
+    """A direct PDF download being relayed. `artifact` is set once `chunks` is exhausted."""
+    size: Optional[int] = None # From Content-Length, when the source sends it
+    chunks: Optional[AsyncIterator[bytes]] = None
+    artifact: Optional[PDFArtifact] = None
+
+def _observe_timings(timings: Dict[str, float]):
+    for stage, ms in timings.items():
+        STAGE_DURATION.observe(ms / 1000, "pdf", stage)
+
 class PDFService:
-    _browser: Optional[Browser] = None
-    _playwright = None
+    def __init__(self):
+        self.pool = BrowserPool(
+            size=settings.pdf.pool_size,
+            max_renders=settings.pdf.max_renders_per_context,
+            acquire_timeout=settings.pdf.acquire_timeout,
+            max_waiters=settings.pdf.max_waiters,
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {} # Callers waiting on each in-flight render
 
-    async def _get_browser(self) -> Browser:
-        """Singleton pattern for Playwright Browser."""
-        if not self._browser:
-            logger.info("Launching Playwright Browser...")
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(headless=True)
-        return self._browser
+    async def start(self):
+        """Launch the browser (or the render workers) and create the contexts ahead of the first render."""
+        if render_farm.workers:
+            await render_farm.start()
+        else:
+            await self.pool.start(warm=True)
 
     async def close(self):
         """Cleanup browser resources."""
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-        if self._playwright:
-            await self._playwright.stop()
-            self._playwright = None
-
-    async def _download_direct_pdf(self, url: str) -> Optional[bytes]:
-        """Try to download PDF directly if Content-Type matches."""
+        await self.pool.close()
+        render_farm.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    async def _probe(self, url: str) -> Optional[str]:
+        """
+        Cheaply find out what `url` serves: a HEAD request, or a one-byte ranged GET when
+        HEAD fails or has no content type (presigned S3 URLs, for one, are signed for GET
+        only and reject HEAD with a 403). Returns the content type, or None if both failed.
+        """
+        client = http_client.client
         try:
-            async with httpx.AsyncClient() as client:
-                # Use stream=True to peek at headers without downloading body yet
-                async with client.stream("GET", url, follow_redirects=True) as resp:
-                    resp.raise_for_status()
-                    content_type = resp.headers.get("content-type", "").lower()
-                    if "application/pdf" in content_type:
-                        logger.info(f"Target is already a PDF ({content_type}). Downloading directly...")
-                        content = await resp.aread()
-                        return content
+            resp = await client.head(url, follow_redirects=True)
+            if not resp.is_success or "content-type" not in resp.headers:
+                async with client.stream("GET", url, headers={"Range": "bytes=0-0"}, follow_redirects=True) as resp:
+                    pass # Headers are enough, the body is never read
+            resp.raise_for_status()
+            return resp.headers.get("content-type", "").lower()
         except Exception as e:
-            logger.warning(f"Failed to check/download direct PDF: {e}")
-        return None
+            logger.warning(f"Failed to probe {url}: {e}")
+            return None
+
+    async def _open_direct_pdf(self, url: str, cache_key: Optional[str]) -> PDFStream:
+        """Start downloading a PDF. The body is relayed by iterating the returned stream."""
+        client = http_client.client
+        resp = await client.send(client.build_request("GET", url), stream=True, follow_redirects=True)
+        try:
+            resp.raise_for_status()
+        except BaseException:
+            await resp.aclose()
+            raise
 
-    async def generate_pdf(self, html_url: str) -> bytes:
+        logger.info(f"Target is already a PDF. Streaming {url}...")
+        length = resp.headers.get("content-length")
+        # The relayed body is decoded, so an encoded length doesn't apply
+        known = length and length.isdigit() and "content-encoding" not in resp.headers
+        stream = PDFStream(size=int(length) if known else None)
+        stream.chunks = self._relay_direct_pdf(resp, cache_key, stream)
+        return stream
+
+    async def _relay_direct_pdf(self, resp: httpx.Response, cache_key: Optional[str], stream: PDFStream) -> AsyncIterator[bytes]:
         """
-        Generate PDF from a URL.
-        1. Check if URL is already a PDF -> Download directly.
-        2. Else -> Render HTML with Playwright.
+        Yield the PDF body in bounded chunks while writing each chunk to the artifact store
+        and feeding the S3 upload, so memory use doesn't depend on the file size.
         """
-        # 1. Direct PDF Check
-        direct_pdf_bytes = await self._download_direct_pdf(html_url)
-        if direct_pdf_bytes:
-            # Upload to S3 (Mock) AND Save Locally concurrently
-            file_key = f"doc_downloaded_{asyncio.get_event_loop().time()}.pdf"
-            await self._process_storage(direct_pdf_bytes, file_key)
-            return direct_pdf_bytes
-
-        # 2. Playwright Render
-        browser = await self._get_browser()
-        context = await browser.new_context()
-        page = await context.new_page()
-
+        digest = hashlib.sha256()
+        s3_chunks: asyncio.Queue = asyncio.Queue(maxsize=settings.pdf.stream_queue_chunks)
+        upload = asyncio.create_task(self._upload_stream_to_s3(s3_chunks, f"doc_downloaded_{uuid.uuid4().hex}.pdf"))
         try:
-            logger.info(f"Navigating to {html_url}")
-            await page.goto(html_url, wait_until="networkidle")
-
-            # Check for mermaid diagrams
-            content = await page.content()
-            if "mermaid" in content:
-                logger.info("Mermaid diagrams detected, waiting for render...")
-                try:
-                    await page.wait_for_selector(".mermaid svg", timeout=5000) 
-                except Exception:
-                    logger.warning("Timed out waiting for .mermaid svg, proceeding...")
-
-            # Inject Print CSS
-            await page.add_style_tag(content="""
-                @page { margin: 20px; size: A4; }
-                body { -webkit-print-color-adjust: exact; }
-            """)
-
-            # Generate PDF
-            pdf_bytes = await page.pdf(format="A4", print_background=True)
-            logger.info(f"PDF generated: {len(pdf_bytes)} bytes")
-
-            # Upload to S3 (Mock) AND Save Locally concurrently
-            file_key = f"doc_{asyncio.get_event_loop().time()}.pdf"
-            await self._process_storage(pdf_bytes, file_key)
-
-            return pdf_bytes
+            async with artifact_store.writer() as writer:
+                async for chunk in resp.aiter_bytes(settings.pdf.stream_chunk_size):
+                    digest.update(chunk)
+                    await asyncio.gather(writer.write(chunk), s3_chunks.put(chunk))
+                    yield chunk
+                await s3_chunks.put(None)
+                artifact = PDFArtifact(digest=digest.hexdigest(), size=writer.size)
+                artifact.path = await writer.commit(artifact.name)
+            await upload
+        except BaseException:
+            upload.cancel()
+            raise
+        finally:
+            await resp.aclose()
 
+        stream.artifact = artifact
+        logger.info(f"Streamed PDF: {artifact.size} bytes")
+        if cache_key is not None:
+            await pdf_cache.record(cache_key, artifact.digest, artifact.size, **source_validators(resp.headers))
+
+    async def _render(self, html_url: str, profile: Optional[str], timeout: Optional[float] = None) -> RenderResult:
+        """
+        Render HTML with Playwright, in the render worker processes if enabled, else on
+        a pooled context. `timeout` bounds the render in the worker process.
+        """
+        try:
+            if settings.pdf.render_workers > 0:
+                return await render_farm.render(html_url, profile, timeout=timeout)
+            async with self.pool.page() as page:
+                return await render_page(page, html_url, profile)
+        except BrowserPoolBusyError:
+            raise
         except Exception as e:
             logger.error(f"PDF generation failed: {e}")
             raise
+
+    async def _produce(self, html_url: str, cache_key: Optional[str], profile: Optional[str], timeout: Optional[float]) -> PDFArtifact:
+        """Render the PDF, store it and record it in the cache."""
+        result = await self._render(html_url, profile, timeout)
+        pdf_bytes, validators = result.pdf, result.validators
+
+        # Named by content so repeated outputs are stored once
+        artifact = PDFArtifact(
+            digest=hashlib.sha256(pdf_bytes).hexdigest(), size=len(pdf_bytes), content=pdf_bytes, timings=result.timings
+        )
+
+        # Upload to S3 (Mock) AND Save Locally concurrently
+        start = time.perf_counter()
+        await self._process_storage(pdf_bytes, artifact.name)
+        artifact.timings["store"] = (time.perf_counter() - start) * 1000
+        _observe_timings(artifact.timings)
+
+        if cache_key is not None:
+            try:
+                await pdf_cache.put(cache_key, artifact.digest, pdf_bytes, **validators)
+            except OSError as e:
+                logger.error(f"Failed to cache PDF for {html_url}: {e}")
+        return artifact
+
+    async def generate_pdf(
+        self, html_url: str, stream: bool = False, profile: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Union[PDFArtifact, PDFStream]:
+        """
+        Generate PDF from a URL.
+        1. Serve from the PDF cache if present and still valid.
+        2. Probe the URL; if it is already a PDF -> Download directly. With `stream`, a
+           PDFStream is returned for the caller to relay; otherwise the download is
+           drained into the artifact store first.
+        3. Else -> Render HTML with Playwright.
+        `profile` names a render profile (`settings.pdf.profiles`); unknown names raise ValueError.
+        `timeout` is passed to the render worker (default `settings.pdf.job_timeout_seconds`).
+        Concurrent renders of the same URL and profile share one render, which is cancelled
+        once none of its callers is waiting for it.
+        """
+        options = render_options(profile)
+        key = pdf_cache.key_for(html_url, options) if settings.pdf.cache_enabled else None
+        if key is not None:
+            start = time.perf_counter()
+            cached = await pdf_cache.get(key, html_url)
+            record_cache("pdf", hit=cached is not None)
+            if cached is not None:
+                entry, path = cached
+                logger.info(f"Serving cached PDF for {html_url}")
+                artifact = PDFArtifact(
+                    digest=entry.digest, size=entry.size, path=path, timings={"cache": (time.perf_counter() - start) * 1000}
+                )
+                _observe_timings(artifact.timings)
+                return artifact
+
+        content_type = await self._probe(html_url)
+        if content_type and "application/pdf" in content_type:
+            direct = await self._open_direct_pdf(html_url, key)
+            if stream:
+                return direct
+            async for _ in direct.chunks:
+                pass
+            return direct.artifact
+
+        if key is None:
+            return await self._produce(html_url, None, profile, timeout)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._produce(html_url, key, profile, timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting doesn't cancel the render for the others
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                task.cancel() # Nobody else is waiting: stop the render (and its worker)
+            raise
         finally:
-            await page.close()
-            await context.close()
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
 
     async def _process_storage(self, file_bytes: bytes, key: str):
         """Run S3 upload and Local Save concurrently."""
@@ -116,17 +261,19 @@ class PDFService:
         await asyncio.sleep(0.5) # Simulate latency
         logger.info(f"Completed MOCK UPLOAD to S3: {key}")
 
+    async def _upload_stream_to_s3(self, chunks: asyncio.Queue, key: str):
+        """Mock S3 multipart upload fed chunk by chunk; a None chunk ends the upload."""
+        logger.info(f"Starting MOCK STREAMED UPLOAD to S3 bucket 'babuai-docs': {key}")
+        size = 0
+        while (chunk := await chunks.get()) is not None:
+            size += len(chunk)
+            await asyncio.sleep(0) # Simulate part upload
+        logger.info(f"Completed MOCK STREAMED UPLOAD to S3: {key} ({size} bytes)")
+
     async def _save_to_local(self, file_bytes: bytes, filename: str):
-        """Save bytes to local downloads directory."""
-        import os, aiofiles
-        
-        local_dir = "downloads"
-        os.makedirs(local_dir, exist_ok=True)
-        file_path = os.path.join(local_dir, filename)
-        
-        logger.info(f"Starting LOCAL SAVE to: {file_path}")
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(file_bytes)
-        logger.info(f"Completed LOCAL SAVE: {file_path}")
+        """Save bytes to the local artifact store."""
+        logger.info(f"Starting LOCAL SAVE: {filename}")
+        path = await artifact_store.put(filename, file_bytes)
+        logger.info(f"Completed LOCAL SAVE: {path}")
 
 pdf_service = PDFService()
@@ -0,0 +1,173 @@
+import asyncio
+import atexit
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import Any, Dict, Optional
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.domain.documents.browser_pool import BrowserPool, BrowserPoolBusyError
+from mugeshbabu_agents.domain.documents.renderer import RenderResult, render_page
+
+logger = logging.getLogger(__name__)
+
+# How often a worker checks whether the render it is running was cancelled
+CANCEL_POLL_SECONDS = 0.25
+
+# Per worker process state, set up by `_init_worker`
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_pool: Optional[BrowserPool] = None
+
+def _init_worker():
+    """Give the worker process its own event loop and browser."""
+    global _worker_loop, _worker_pool
+    logging.basicConfig(level=settings.app.log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    # A worker renders one page at a time
+    _worker_pool = BrowserPool(
+        size=1,
+        max_renders=settings.pdf.max_renders_per_context,
+        acquire_timeout=settings.pdf.acquire_timeout,
+        max_waiters=1,
+    )
+    atexit.register(_close_worker)
+
+def _close_worker():
+    if _worker_loop is not None and _worker_pool is not None:
+        _worker_loop.run_until_complete(_worker_pool.close())
+
+async def _render(html_url: str, profile: Optional[str]) -> RenderResult:
+    async with _worker_pool.page() as page:
+        return await render_page(page, html_url, profile)
+
+def _start_in_worker():
+    """Runs in a worker process: launch its browser ahead of the first render."""
+    _worker_loop.run_until_complete(_worker_pool.start(warm=True))
+
+async def _watch_cancel(cancel: Any, render: asyncio.Future):
+    """Cancel `render` once the API process sets `cancel` (a Manager Event)."""
+    loop = asyncio.get_running_loop()
+    while not render.done():
+        try:
+            cancelled = await loop.run_in_executor(None, cancel.wait, CANCEL_POLL_SECONDS)
+        except (EOFError, OSError):
+            return # The API process shut the manager down; the render's own timeout still applies
+        if cancelled:
+            render.cancel()
+            return
+
+async def _render_cancellable(html_url: str, profile: Optional[str], timeout: float, cancel: Any) -> RenderResult:
+    render = asyncio.ensure_future(asyncio.wait_for(_render(html_url, profile), timeout))
+    watcher = asyncio.ensure_future(_watch_cancel(cancel, render))
+    try:
+        return await render
+    finally:
+        watcher.cancel()
+
+def _render_in_worker(html_url: str, profile: Optional[str], timeout: float, cancel: Any) -> RenderResult:
+    """Runs in a worker process."""
+    return _worker_loop.run_until_complete(_render_cancellable(html_url, profile, timeout, cancel))
+
+class RenderFarm:
+    """
+    Renders PDFs in `settings.pdf.render_workers` processes, each with its own
+    Playwright browser, so Chromium work is spread across cores instead of sharing
+    the API's event loop. At most `render_workers + max_waiters` renders are accepted
+    at once. A crashed worker breaks the process pool; it is replaced on the next call.
+
+    Each render gets a timeout and a cancel event shared with the worker (through a
+    multiprocessing Manager): when the caller is cancelled or times out, the worker
+    stops the render and is free for the next one.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[SyncManager] = None
+        self._pending = 0
+        self.renders = 0
+        self.failures = 0
+        self.restarts = 0
+
+    @property
+    def workers(self) -> int:
+        return settings.pdf.render_workers
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(f"Starting {self.workers} PDF render workers")
+            # Playwright doesn't survive fork(), start clean interpreters
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    async def render(self, html_url: str, profile: Optional[str] = None, timeout: Optional[float] = None) -> RenderResult:
+        """Render `html_url` with a render profile in a worker."""
+        if self._pending >= self.workers + settings.pdf.max_waiters:
+            raise BrowserPoolBusyError("PDF render queue is full")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            cancel = self._manager.Event()
+            try:
+                result = await loop.run_in_executor(
+                    executor,
+                    _render_in_worker,
+                    html_url,
+                    profile,
+                    timeout or settings.pdf.job_timeout_seconds,
+                    cancel,
+                )
+            except asyncio.CancelledError:
+                # Stop the render in the worker too, not just our wait for it
+                cancel.set()
+                raise
+            self.renders += 1
+            return result
+        except BrokenProcessPool:
+            logger.error("PDF render worker died, restarting the worker pool")
+            self.failures += 1
+            self.restarts += 1
+            self.shutdown()
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._pending -= 1
+
+    async def start(self):
+        """Start the workers and their browsers now instead of on the first render."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Best effort: one task per worker, an idle worker may pick up two
+        await asyncio.gather(*(loop.run_in_executor(executor, _start_in_worker) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._executor is not None,
+            "pending": self._pending,
+            "renders": self.renders,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+render_farm = RenderFarm()
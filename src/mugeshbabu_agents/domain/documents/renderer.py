@@ -0,0 +1,101 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Route
+
+from mugeshbabu_agents.core.config import RenderProfile, settings
+
+logger = logging.getLogger(__name__)
+
+# page.pdf() options; part of the cache key
+PDF_OPTIONS: Dict[str, Any] = {"format": "A4", "print_background": True}
+
+PRINT_CSS = """
+    @page { margin: 20px; size: A4; }
+    body { -webkit-print-color-adjust: exact; }
+"""
+
+# True once no element matches any of the pending selectors
+READY_CHECK = "selectors => selectors.every(s => !document.querySelector(s))"
+
+@dataclass
+class RenderResult:
+    pdf: bytes
+    validators: Dict[str, Optional[str]]
+    timings: Dict[str, float] = field(default_factory=dict) # Stage -> milliseconds
+
+def get_profile(name: Optional[str]) -> RenderProfile:
+    """Look up a render profile. Raises ValueError for unknown names."""
+    name = name or settings.pdf.default_profile
+    try:
+        return settings.pdf.profiles[name]
+    except KeyError:
+        raise ValueError(f"Unknown render profile: {name}")
+
+def render_options(profile_name: Optional[str]) -> Dict[str, Any]:
+    """Everything that affects the output for a URL; used as part of the cache key."""
+    return {**PDF_OPTIONS, "profile": get_profile(profile_name).model_dump()}
+
+def source_validators(headers) -> Dict[str, Optional[str]]:
+    """Cache validators from the source response headers."""
+    return {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+
+def _is_blocked_host(host: str, domains) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+async def _block_resources(page: "Page", profile: RenderProfile):
+    """Abort requests for blocked resource types and domains."""
+    blocked_types = set(profile.blocked_resource_types)
+    domains = profile.blocked_domains
+
+    async def handle(route: "Route"):
+        request = route.request
+        if request.resource_type in blocked_types or _is_blocked_host(urlsplit(request.url).hostname or "", domains):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+async def render_page(page: "Page", html_url: str, profile_name: Optional[str] = None) -> RenderResult:
+    """
+    Render `html_url` to PDF on `page` using a render profile. Shared by the in-process
+    browser pool and the render worker processes.
+    """
+    profile = get_profile(profile_name)
+    if profile.blocked_resource_types or profile.blocked_domains:
+        await _block_resources(page, profile)
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    logger.info(f"Navigating to {html_url}")
+    response = await page.goto(html_url, wait_until=profile.wait_until)
+    timings["navigate"] = (time.perf_counter() - start) * 1000
+
+    # Wait for client-side rendering (e.g. mermaid diagrams) without serializing the DOM
+    stage = time.perf_counter()
+    if profile.pending_selectors:
+        try:
+            await page.wait_for_function(READY_CHECK, arg=profile.pending_selectors, timeout=profile.ready_timeout_ms)
+        except Exception:
+            logger.warning(f"Timed out waiting for {profile.pending_selectors} to render, proceeding...")
+    timings["ready"] = (time.perf_counter() - stage) * 1000
+
+    # Inject Print CSS
+    stage = time.perf_counter()
+    await page.add_style_tag(content=PRINT_CSS)
+
+    # Generate PDF
+    pdf_bytes = await page.pdf(**PDF_OPTIONS)
+    timings["pdf"] = (time.perf_counter() - stage) * 1000
+
+    logger.info(
+        f"PDF generated: {len(pdf_bytes)} bytes "
+        f"(navigate={timings['navigate']:.0f}ms ready={timings['ready']:.0f}ms pdf={timings['pdf']:.0f}ms)"
+    )
+    return RenderResult(pdf_bytes, source_validators(response.headers if response else {}), timings)
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.domain.agents.models import Agent
+from mugeshbabu_agents.domain.agents.service import AgentRepository
+from mugeshbabu_agents.domain.teams.models import Team, TeamMembership, TeamMembershipStatus
+from mugeshbabu_agents.infrastructure.db import db_manager
+from mugeshbabu_agents.infrastructure.repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Raised by MongoDB when change streams are not available (standalone server)
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+def build_members_match(team: Team) -> Optional[Dict[str, Any]]:
+    """
+    Build a single `$match` covering static `agent_ids` AND dynamic filters.
+    Returns None when the team has no members at all.
+    """
+    clauses = []
+    static_agent_ids = [ObjectId(aid) for aid in team.agent_ids if ObjectId.is_valid(aid)]
+    if static_agent_ids:
+        clauses.append({"_id": {"$in": static_agent_ids}})
+    if team.dynamic_filters:
+        clauses.append(team.dynamic_filters)
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$or": clauses}
+
+class TeamMembershipRepository(BaseRepository[TeamMembership]):
+    pass
+
+class TeamMembershipService:
+    """
+    Materialized team membership.
+    Each team's resolved agent ids are stored (sorted) in `team_memberships` so reads
+    don't re-run dynamic filters. Entries are marked stale by the change stream watcher
+    and rebuilt on the next read. Without change streams, entries expire after
+    `settings.teams.membership_max_age_seconds`.
+
+    Every invalidation bumps the entry's `version`. A rebuild records the version it
+    started from and only replaces the entry if it is unchanged, so an invalidation
+    that arrives while the query runs is never overwritten by the older result.
+    """
+
+    def __init__(self):
+        self.watching = False
+        self._watch_tasks: List[asyncio.Task] = []
+        self._rebuilds: Dict[str, Tuple[int, asyncio.Task]] = {} # team id -> (version, task)
+
+    def _repo(self) -> TeamMembershipRepository:
+        return TeamMembershipRepository(db_manager.get_master_db(), "team_memberships", TeamMembership)
+
+    def _is_fresh(self, membership: TeamMembership) -> bool:
+        if membership.stale:
+            return False
+        if self.watching:
+            return True
+        age = (datetime.utcnow() - membership.built_at).total_seconds()
+        return age < settings.teams.membership_max_age_seconds
+
+    async def _version(self, team_id: ObjectId) -> Optional[int]:
+        """Current version of the team's entry, None if it isn't materialized."""
+        doc = await self._repo().collection.find_one({"_id": team_id}, {"version": 1})
+        return None if doc is None else doc.get("version", 0)
+
+    async def _build(self, team: Team, version: Optional[int]) -> TeamMembership:
+        match = build_members_match(team)
+        agent_ids: List[ObjectId] = []
+        if match is not None:
+            repo = AgentRepository(db_manager.get_master_db(), "agents", Agent)
+            stream = repo.stream(match, projection={"_id": 1}, batch_size=5000, sort=[("_id", 1)])
+            agent_ids = [doc["_id"] async for doc in stream]
+
+        membership = TeamMembership(
+            _id=team.id,
+            agent_ids=agent_ids,
+            static_ids=[ObjectId(aid) for aid in team.agent_ids if ObjectId.is_valid(aid)],
+            dynamic=bool(team.dynamic_filters),
+            version=version or 0,
+            built_at=datetime.utcnow()
+        )
+        # Matches a missing entry (inserted) or one still at `version`. If the entry
+        # was invalidated meanwhile, the upsert collides on _id and it stays stale.
+        try:
+            await self._repo().collection.replace_one(
+                {"_id": team.id, "version": version},
+                membership.model_dump(by_alias=True),
+                upsert=True
+            )
+        except DuplicateKeyError:
+            logger.info(f"Membership of team {team.id} changed during rebuild, leaving it stale")
+            return membership
+        logger.info(f"Rebuilt membership for team {team.id}: {len(agent_ids)} agents")
+        return membership
+
+    async def rebuild(self, team: Team) -> TeamMembership:
+        """
+        Rebuild a team's membership. Concurrent rebuilds of the same team share one
+        query, unless it started before the latest invalidation.
+        """
+        key = str(team.id)
+        version = await self._version(team.id)
+        current = self._rebuilds.get(key)
+        if current is not None and current[0] >= (version or 0):
+            return await current[1]
+
+        task = asyncio.create_task(self._build(team, version))
+        entry = (version or 0, task)
+        self._rebuilds[key] = entry
+        task.add_done_callback(lambda _: self._rebuilds.pop(key) if self._rebuilds.get(key) is entry else None)
+        return await task
+
+    async def get_member_ids(self, team: Team) -> List[ObjectId]:
+        """Return the team's agent ids, sorted, from the materialized set."""
+        membership = await self._repo().get(team.id, trusted=True)
+        if membership is None or not self._is_fresh(membership):
+            membership = await self.rebuild(team)
+        return membership.agent_ids
+
+    async def status(self, team_id: str) -> TeamMembershipStatus:
+        """Report the materialized membership of a team and how stale it is."""
+        membership = await self._repo().get(team_id, trusted=True)
+        if membership is None:
+            return TeamMembershipStatus(team_id=team_id, materialized=False, stale=True, watching=self.watching)
+
+        return TeamMembershipStatus(
+            team_id=team_id,
+            materialized=True,
+            member_count=len(membership.agent_ids),
+            built_at=membership.built_at,
+            age_seconds=(datetime.utcnow() - membership.built_at).total_seconds(),
+            stale=not self._is_fresh(membership),
+            stale_since=membership.stale_since,
+            watching=self.watching
+        )
+
+    async def mark_stale(self, filter: Dict[str, Any]) -> int:
+        """Flag matching memberships so the next read rebuilds them. Returns how many became stale."""
+        collection = self._repo().collection
+        result = await collection.update_many(
+            {**filter, "stale": False},
+            {"$set": {"stale_since": datetime.utcnow()}}
+        )
+        # Bumped even when already stale, so a rebuild in progress doesn't land
+        await collection.update_many(filter, {"$set": {"stale": True}, "$inc": {"version": 1}})
+        return result.modified_count
+
+    async def _watch_teams(self):
+        db = db_manager.get_master_db()
+        async with db.teams.watch() as stream:
+            self.watching = True
+            async for change in stream:
+                team_id = change["documentKey"]["_id"]
+                if change["operationType"] == "delete":
+                    await self._repo().collection.delete_one({"_id": team_id})
+                else:
+                    await self.mark_stale({"_id": team_id})
+
+    async def _watch_agents(self):
+        db = db_manager.get_master_db()
+        async with db.agents.watch() as stream:
+            self.watching = True
+            async for change in stream:
+                agent_id = change["documentKey"]["_id"]
+                # Any agent change may move it in or out of a dynamic team. Static teams
+                # only care about the agents they list.
+                await self.mark_stale({
+                    "$or": [{"dynamic": True}, {"static_ids": agent_id}, {"agent_ids": agent_id}]
+                })
+
+    async def _run_watch(self, name: str, watch):
+        while True:
+            try:
+                await watch()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning(
+                        f"Change streams unavailable, team membership falls back to "
+                        f"{settings.teams.membership_max_age_seconds}s expiry"
+                    )
+                    self.watching = False
+                    return
+                logger.error(f"Membership watcher ({name}) failed: {e}")
+            except PyMongoError as e:
+                logger.error(f"Membership watcher ({name}) failed: {e}")
+
+            # Changes may have been missed while the stream was down
+            self.watching = False
+            try:
+                await self.mark_stale({})
+            except PyMongoError as e:
+                logger.error(f"Could not invalidate team memberships: {e}")
+            await asyncio.sleep(5)
+
+    def start(self):
+        """Start watching `agents` and `teams` for changes."""
+        if not settings.teams.membership_watch or self._watch_tasks:
+            return
+        self._watch_tasks = [
+            asyncio.create_task(self._run_watch("teams", self._watch_teams)),
+            asyncio.create_task(self._run_watch("agents", self._watch_agents)),
+        ]
+
+    async def stop(self):
+        for task in self._watch_tasks:
+            task.cancel()
+        await asyncio.gather(*self._watch_tasks, return_exceptions=True)
+        self._watch_tasks = []
+        self.watching = False
+
+membership_service = TeamMembershipService()
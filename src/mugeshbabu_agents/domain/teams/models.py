@@ -20,3 +20,52 @@ class CreateTeamRequest(BaseModel):
     description: Optional[str] = None
     agent_ids: List[str] = []
     dynamic_filters: Optional[Dict[str, Any]] = None
+
+class TeamAgentPage(BaseModel):
+    """A page of team agents. Items are raw (optionally projected) agent documents."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class TeamMembership(BaseModel):
+    """Materialized member list of a team, keyed by team id."""
+    id: Optional[PyObjectId] = Field(None, alias="_id")
+    agent_ids: List[PyObjectId] = [] # Sorted ascending
+    static_ids: List[PyObjectId] = []
+    dynamic: bool = False
+    stale: bool = False
+    stale_since: Optional[datetime] = None
+    version: int = 0 # Bumped by every invalidation
+    built_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+class TeamMembershipStatus(BaseModel):
+    team_id: str
+    materialized: bool
+    member_count: int = 0
+    built_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
+    stale: bool
+    stale_since: Optional[datetime] = None
+    watching: bool # False when change streams are unavailable and expiry is used instead
+
+class ExecuteTeamRequest(BaseModel):
+    input_data: Dict[str, Any] = {}
+    concurrency: Optional[int] = Field(None, ge=1) # Overrides the configured fan-out limit
+
+class TeamExecutionMember(BaseModel):
+    agent_id: str
+    instance_id: str
+    status: str
+
+class TeamExecution(BaseModel):
+    """Aggregate handle for a team-wide fan-out execution."""
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    team_id: str
+    project_id: str
+    status: str = "PENDING"  # PENDING, QUEUED, PARTIAL, FAILED
+    members: List[TeamExecutionMember] = []
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True, json_encoders={ObjectId: str})
@@ -1,19 +1,31 @@
 import logging
-from typing import List, Optional
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 from bson import ObjectId
 
 from mugeshbabu_agents.infrastructure.db import db_manager
-from mugeshbabu_agents.domain.teams.models import Team, CreateTeamRequest
+from mugeshbabu_agents.domain.teams.models import (
+    Team, CreateTeamRequest, TeamAgentPage, TeamExecution, TeamExecutionMember, TeamMembershipStatus
+)
+from mugeshbabu_agents.domain.teams.membership import membership_service
 from mugeshbabu_agents.domain.agents.models import Agent
+from mugeshbabu_agents.domain.agents.service import AgentRepository, agent_service
 
 logger = logging.getLogger(__name__)
-from mugeshbabu_agents.infrastructure.repository import BaseRepository
+from mugeshbabu_agents.infrastructure.repository import BaseRepository, InvalidCursorError, decode_cursor, encode_cursor
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec, PROJECT
 
 logger = logging.getLogger(__name__)
 
 class TeamRepository(BaseRepository[Team]):
     pass
 
+class TeamExecutionRepository(BaseRepository[TeamExecution]):
+    collection_name = "team_executions"
+    db_scope = PROJECT
+    indexes = [IndexSpec((("team_id", 1), ("created_at", -1)))]
+
 class TeamService:
     def __init__(self):
         # We'll initialize repo on demand or in dependency injection
@@ -31,43 +43,129 @@ class TeamService:
         """Get a team by ID."""
         db = db_manager.get_master_db()
         repo = TeamRepository(db, "teams", Team)
-        return await repo.get(team_id)
+        return await repo.get(team_id, trusted=True)
 
     async def get_team_agents(self, team_id: str) -> List[Agent]:
         """
         Get all agents belonging to a team.
-        Combines static `agent_ids` AND dynamic resolution based on filters.
+        Static `agent_ids` AND dynamic filters are resolved from the materialized membership.
         """
         team = await self.get_team(team_id)
         if not team:
             raise ValueError(f"Team {team_id} not found")
 
+        agent_ids = await membership_service.get_member_ids(team)
+        if not agent_ids:
+            return []
+
         db = db_manager.get_master_db()
-        # Agents might not have a dedicated repository yet if they are just mocked,
-        # but let's assume we can access the 'agents' collection.
-        # For this complex query, we might still use direct DB or extend Repository.
-        
-        agents = []
-
-        # 1. Fetch static agents
-        if team.agent_ids:
-            static_agent_ids = [ObjectId(aid) for aid in team.agent_ids if ObjectId.is_valid(aid)]
-            if static_agent_ids:
-                cursor = db.agents.find({"_id": {"$in": static_agent_ids}})
-                async for doc in cursor:
-                    agents.append(Agent(**doc))
-
-        # 2. Fetch dynamic agents
-        if team.dynamic_filters:
-            filter_query = team.dynamic_filters.copy()
-            found_ids = [a.id for a in agents if a.id]
-            if found_ids:
-                filter_query["_id"] = {"$nin": found_ids}
-            
-            cursor = db.agents.find(filter_query)
-            async for doc in cursor:
-                agents.append(Agent(**doc))
-
-        return agents
+        cursor = db.agents.find({"_id": {"$in": agent_ids}}).sort("_id", 1)
+        return [Agent(**doc) async for doc in cursor]
+
+    async def get_team_agents_page(
+        self,
+        team_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> TeamAgentPage:
+        """
+        Get one page of a team's agents, sorted by `_id`.
+        Documents are returned as projected dicts without model validation.
+        `cursor` is the `next_cursor` of the previous page.
+        """
+        team = await self.get_team(team_id)
+        if not team:
+            raise ValueError(f"Team {team_id} not found")
+
+        after = decode_cursor(cursor).get("id") if cursor else None
+        if cursor and not isinstance(after, ObjectId):
+            raise InvalidCursorError("Invalid cursor")
+
+        agent_ids = await membership_service.get_member_ids(team)
+        start = bisect_right(agent_ids, after) if after else 0
+        page_ids = agent_ids[start:start + limit]
+        if not page_ids:
+            return TeamAgentPage.model_construct(items=[], next_cursor=None)
+
+        db = db_manager.get_master_db()
+        projection = {field: 1 for field in fields} if fields else None
+        docs = await db.agents.find({"_id": {"$in": page_ids}}, projection).sort("_id", 1).to_list(length=limit)
+
+        next_cursor = encode_cursor({"id": page_ids[-1]}) if start + limit < len(agent_ids) else None
+        return TeamAgentPage.model_construct(items=docs, next_cursor=next_cursor)
+
+    async def stream_team_agents(self, team_id: str, fields: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every agent of a team as a raw (optionally projected) document.
+        Agents are read in batches so large teams are never held in memory.
+        """
+        team = await self.get_team(team_id)
+        if not team:
+            raise ValueError(f"Team {team_id} not found")
+
+        agent_ids = await membership_service.get_member_ids(team)
+        repo = AgentRepository(db_manager.get_master_db(), "agents", Agent)
+        projection = {field: 1 for field in fields} if fields else {}
+        async for doc in repo.stream({"_id": {"$in": agent_ids}}, projection=projection, sort=[("_id", 1)]):
+            yield doc
+
+    async def get_membership_status(self, team_id: str) -> TeamMembershipStatus:
+        """Report how fresh a team's materialized membership is."""
+        if not await self.get_team(team_id):
+            raise ValueError(f"Team {team_id} not found")
+        return await membership_service.status(team_id)
+
+    async def rebuild_membership(self, team_id: str) -> TeamMembershipStatus:
+        """Force a rebuild of a team's materialized membership."""
+        team = await self.get_team(team_id)
+        if not team:
+            raise ValueError(f"Team {team_id} not found")
+        await membership_service.rebuild(team)
+        return await membership_service.status(team_id)
+
+    async def execute_team(
+        self,
+        team_id: str,
+        project_id: str,
+        input_data: Dict[str, Any],
+        user_token: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ) -> TeamExecution:
+        """
+        Execute every agent of a team.
+        Members are resolved once and executions are fanned out with a concurrency limit.
+        """
+        agents = await self.get_team_agents(team_id)
+        instances = await agent_service.execute_agents(
+            agents,
+            project_id=project_id,
+            input_data=input_data,
+            user_token=user_token,
+            concurrency=concurrency
+        )
+
+        members = [
+            TeamExecutionMember(agent_id=i.master_agent_id, instance_id=str(i.id), status=i.status)
+            for i in instances
+        ]
+        failed = sum(1 for m in members if m.status == "FAILED")
+        if not members or failed == len(members):
+            status = "FAILED"
+        elif failed:
+            status = "PARTIAL"
+        else:
+            status = "QUEUED"
+
+        execution = TeamExecution(
+            team_id=team_id,
+            project_id=project_id,
+            status=status,
+            members=members,
+            updated_at=datetime.utcnow()
+        )
+        project_db = db_manager.get_project_db(project_id)
+        repo = TeamExecutionRepository(project_db, "team_executions", TeamExecution)
+        return await repo.create(execution)
 
 team_service = TeamService()
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiofiles
+
+from mugeshbabu_agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+# Temp files not written to for this long are left over from an interrupted write.
+# Younger ones may belong to a write in progress in another worker process.
+STALE_TMP_SECONDS = 3600
+VALID_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+@dataclass
+class ArtifactEntry:
+    size: int
+    created_at: float
+    accessed_at: float
+
+class ArtifactWriter:
+    """Incremental write to a temp file; the artifact appears only on `commit`."""
+
+    def __init__(self, store: "ArtifactStore"):
+        self.store = store
+        self.tmp_path = os.path.join(store.directory, f"{uuid.uuid4().hex}.tmp")
+        self.size = 0
+        self.committed = False
+        self._file = None
+
+    async def write(self, chunk: bytes):
+        if self._file is None:
+            self._file = await aiofiles.open(self.tmp_path, "wb")
+        await self._file.write(chunk)
+        self.size += len(chunk)
+
+    async def _close_file(self):
+        if self._file is None:
+            self._file = await aiofiles.open(self.tmp_path, "wb") # Empty artifact
+        await self._file.close()
+
+    async def commit(self, name: str) -> str:
+        """Move the written data into place as `name`. Returns its path."""
+        path = self.store._path(name)
+        await self._close_file()
+        os.replace(self.tmp_path, path)
+        self.committed = True
+        self.store._record(name, self.size)
+        return path
+
+    async def discard(self):
+        if self._file is not None:
+            await self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+class ArtifactStore:
+    """
+    Size-capped local file store for generated documents.
+
+    Files are written to a temp file and renamed into place, so readers never see a
+    partial artifact. An index (`index.json`, least recently used first) tracks sizes
+    and access times; on startup it is reconciled with the directory, dropping entries
+    whose file is gone, adopting untracked files and removing stale temp files.
+    Artifacts older than `ttl_seconds` are expired, then the least recently used are
+    evicted until the store fits in `max_bytes`.
+
+    The directory is the source of truth; the index only carries access times. It is
+    written at most every `index_flush_seconds`, in a thread, and on close. Each worker
+    process keeps its own view and enforces the limits on it, so with several workers
+    sharing a directory the cap is per process: a lookup adopts files another process
+    stored and forgets ones it removed, and the last index written wins.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: int, index_flush_seconds: float = 5.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.index_flush_seconds = index_flush_seconds
+        self._flush: Optional[asyncio.Task] = None
+        self._entries: "OrderedDict[str, ArtifactEntry]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self.evicted = 0
+
+    def _path(self, name: str) -> str:
+        # The index and temp files live in the same directory but aren't artifacts
+        if not VALID_NAME.match(name) or name == INDEX_FILE or name.endswith(".tmp"):
+            raise ValueError(f"Invalid artifact name: {name}")
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        """Load the index and reconcile it with the directory contents."""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        stored: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Artifact index unreadable, rebuilding from directory: {e}")
+
+        on_disk = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name == INDEX_FILE:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue # Renamed or removed by another process meanwhile
+            if entry.name.endswith(".tmp"):
+                if stat.st_mtime < time.time() - STALE_TMP_SECONDS:
+                    try:
+                        os.unlink(entry.path) # Interrupted write
+                    except FileNotFoundError:
+                        pass
+                continue
+            on_disk[entry.name] = stat
+
+        entries = []
+        for name, stat in on_disk.items():
+            if name in stored:
+                entries.append((name, ArtifactEntry(**{**stored[name], "size": stat.st_size})))
+            else:
+                entries.append((name, ArtifactEntry(size=stat.st_size, created_at=stat.st_mtime, accessed_at=stat.st_mtime)))
+        entries.sort(key=lambda item: item[1].accessed_at)
+
+        self._entries = OrderedDict(entries)
+        self._total = sum(entry.size for entry in self._entries.values())
+        self._loaded = True
+        logger.info(f"Artifact store {self.directory}: {len(self._entries)} artifacts, {self._total} bytes")
+        self._evict()
+        self._save_index()
+
+    def _write_index(self, entries: Dict[str, Dict[str, Any]]):
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+
+    def _snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: asdict(entry) for name, entry in self._entries.items()}
+
+    def _save_index(self):
+        """Schedule an index write; changes made until it runs share it."""
+        if self._flush is not None:
+            return
+        try:
+            self._flush = asyncio.get_running_loop().create_task(self._flush_index())
+        except RuntimeError:
+            self._write_index(self._snapshot()) # No event loop (scripts)
+
+    async def _flush_index(self):
+        await asyncio.sleep(self.index_flush_seconds)
+        self._flush = None # Later changes schedule the next write
+        try:
+            await asyncio.to_thread(self._write_index, self._snapshot())
+        except OSError as e:
+            logger.warning(f"Failed to write the artifact index: {e}")
+
+    def _remove(self, name: str):
+        entry = self._entries.pop(name)
+        self._total -= entry.size
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> int:
+        """Expire old artifacts, then drop least recently used ones until under the byte cap."""
+        removed = 0
+        if self.ttl_seconds:
+            cutoff = time.time() - self.ttl_seconds
+            for name in [name for name, entry in self._entries.items() if entry.created_at < cutoff]:
+                self._remove(name)
+                removed += 1
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+            removed += 1
+        if removed:
+            self.evicted += removed
+            logger.info(f"Evicted {removed} artifacts, {self._total} bytes in use")
+        return removed
+
+    def _record(self, name: str, size: int):
+        now = time.time()
+        if name in self._entries:
+            self._total -= self._entries.pop(name).size
+        self._entries[name] = ArtifactEntry(size=size, created_at=now, accessed_at=now)
+        self._total += size
+        self._evict()
+        self._save_index()
+
+    async def put(self, name: str, data: bytes) -> str:
+        """Atomically write an artifact. Returns its path."""
+        self._load()
+        path = self._path(name)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._record(name, len(data))
+        return path
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[ArtifactWriter]:
+        """Stream an artifact to disk. Nothing is kept unless `commit` is called."""
+        self._load()
+        writer = ArtifactWriter(self)
+        try:
+            yield writer
+        finally:
+            if not writer.committed:
+                await writer.discard()
+
+    def exists(self, name: str) -> bool:
+        self._load()
+        return name in self._entries
+
+    def path(self, name: str) -> Optional[str]:
+        """Path of a stored artifact (marking it recently used), or None if missing or expired."""
+        self._load()
+        path = self._path(name)
+        entry = self._entries.get(name)
+        if entry is None:
+            # Possibly stored by another worker process
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            entry = self._entries[name] = ArtifactEntry(size=stat.st_size, created_at=stat.st_mtime, accessed_at=stat.st_mtime)
+            self._total += entry.size
+        elif not os.path.exists(path):
+            # Removed by another worker process
+            self._total -= self._entries.pop(name).size
+            return None
+        if self.ttl_seconds and entry.created_at < time.time() - self.ttl_seconds:
+            self._remove(name)
+            return None
+        entry.accessed_at = time.time()
+        self._entries.move_to_end(name)
+        return path
+
+    def delete(self, name: str) -> bool:
+        self._load()
+        if name not in self._entries:
+            return False
+        self._remove(name)
+        self._save_index()
+        return True
+
+    def close(self):
+        """Persist access times."""
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        if self._loaded:
+            self._write_index(self._snapshot())
+
+    def stats(self) -> Dict[str, Any]:
+        self._load()
+        return {
+            "directory": self.directory,
+            "artifacts": len(self._entries),
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+        }
+
+artifact_store = ArtifactStore(
+    settings.artifacts.directory,
+    max_bytes=settings.artifacts.max_bytes,
+    ttl_seconds=settings.artifacts.ttl_seconds,
+    index_flush_seconds=settings.artifacts.index_flush_seconds,
+)
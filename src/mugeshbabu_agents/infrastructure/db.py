@@ -1,46 +1,265 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from mugeshbabu_agents.core.config import settings
+from pymongo import ReadPreference, monitoring
+from mugeshbabu_agents.core.config import settings, TenantRoute
+from mugeshbabu_agents.core.metrics import MONGO_COMMAND_DURATION
+from mugeshbabu_agents.infrastructure.indexes import index_registry, MASTER, PROJECT
 import logging
 
 logger = logging.getLogger(__name__)
 
+PROJECT_DB_PREFIX = "babuai-"
+DEFAULT_CLUSTER = "default"
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+class PoolUsageListener(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """
+    Tracks connection pool usage of one cluster and in-flight commands per database,
+    and records command latencies. pymongo calls listeners from its own threads, hence
+    the lock.
+    """
+
+    def __init__(self, cluster: str):
+        self.cluster = cluster
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+        self.in_flight: Dict[str, int] = {}
+        self.commands: Dict[str, int] = {}
+
+    def _add(self, attr: str, delta: int):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + delta)
+
+    # Connection pool events
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): self._add("open_connections", 1)
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self._add("open_connections", -1)
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): self._add("checkout_failures", 1)
+    def connection_checked_out(self, event): self._add("checked_out", 1)
+    def connection_checked_in(self, event): self._add("checked_out", -1)
+
+    # Command events
+    def started(self, event):
+        with self._lock:
+            self.in_flight[event.database_name] = self.in_flight.get(event.database_name, 0) + 1
+            self.commands[event.database_name] = self.commands.get(event.database_name, 0) + 1
+
+    def _finished(self, event):
+        with self._lock:
+            remaining = self.in_flight.get(event.database_name, 1) - 1
+            if remaining > 0:
+                self.in_flight[event.database_name] = remaining
+            else:
+                self.in_flight.pop(event.database_name, None)
+
+    def succeeded(self, event):
+        self._finished(event)
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, self.cluster, event.command_name)
+
+    def failed(self, event):
+        self._finished(event)
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, self.cluster, event.command_name)
+
+    def forget(self, db_name: str):
+        """Drop per-database counters, e.g. when a project handle is evicted."""
+        with self._lock:
+            self.commands.pop(db_name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "checkout_failures": self.checkout_failures,
+                "in_flight_commands": dict(self.in_flight),
+                "commands": dict(self.commands),
+            }
+
 class DatabaseManager:
     client: AsyncIOMotorClient | None = None
     master_db: AsyncIOMotorDatabase | None = None
 
-    async def connect(self):
-        """Establish connection to MongoDB."""
-        logger.info(f"Connecting to MongoDB at {settings.mongo.uri}")
-        self.client = AsyncIOMotorClient(
-            settings.mongo.uri,
-            minPoolSize=settings.mongo.min_pool_size,
-            maxPoolSize=settings.mongo.max_pool_size,
+    def __init__(self):
+        # Project DBs whose indexes have been ensured by this process
+        self._indexed_project_dbs: set[str] = set()
+        # One client (and so one connection pool) per cluster URI
+        self._clients: Dict[str, AsyncIOMotorClient] = {}
+        self._listeners: Dict[str, PoolUsageListener] = {}
+        self._cluster_by_uri: Dict[str, str] = {}
+        # Bounded LRU of project database handles
+        self._project_dbs: OrderedDict[str, AsyncIOMotorDatabase] = OrderedDict()
+
+    def _create_client(self, cluster: str, uri: str, max_pool_size: int) -> AsyncIOMotorClient:
+        listener = PoolUsageListener(cluster)
+        client = AsyncIOMotorClient(
+            uri,
+            minPoolSize=min(settings.mongo.min_pool_size, max_pool_size),
+            maxPoolSize=max_pool_size,
+            event_listeners=[listener],
             # uuidRepresentation="standard" # Recommended for new projects
         )
+        self._clients[cluster] = client
+        self._listeners[cluster] = listener
+        self._cluster_by_uri[uri] = cluster
+        return client
+
+    async def connect(self):
+        """Establish connection to MongoDB (and to every cluster tenants are routed to)."""
+        logger.info(f"Connecting to MongoDB at {settings.mongo.uri}")
+        self.client = self._create_client(DEFAULT_CLUSTER, settings.mongo.uri, settings.mongo.max_pool_size)
         self.master_db = self.client[settings.mongo.db_name]
+
+        routed_uris = sorted({r.uri for r in settings.mongo.tenant_routes.values() if r.uri and r.uri != settings.mongo.uri})
+        if len(routed_uris) + 1 > settings.mongo.max_clusters:
+            raise RuntimeError(
+                f"Tenant routes use {len(routed_uris) + 1} clusters, more than MONGO_MAX_CLUSTERS={settings.mongo.max_clusters}"
+            )
+        for i, uri in enumerate(routed_uris, start=1):
+            self._create_client(f"cluster-{i}", uri, settings.mongo.routed_max_pool_size)
+        if routed_uris:
+            logger.info(f"Routing {len(settings.mongo.tenant_routes)} tenants across {len(routed_uris)} extra clusters")
+
         logger.info(f"Connected to MongoDB: {settings.mongo.db_name}")
 
+    async def ping(self, connections: int = 1):
+        """
+        Ping every cluster. `connections` concurrent pings per cluster open that many
+        pooled connections, so the first requests don't pay for the handshakes.
+        """
+        await asyncio.gather(*(
+            client.admin.command("ping") for client in list(self._clients.values()) for _ in range(connections)
+        ))
+
     async def close(self):
         """Close MongoDB connection."""
         if self.client:
             logger.info("Closing MongoDB connection")
-            self.client.close()
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._listeners.clear()
+            self._cluster_by_uri.clear()
+            self._project_dbs.clear()
             self.client = None
             self.master_db = None
 
+    def _route(self, project_id: str) -> TenantRoute | None:
+        return settings.mongo.tenant_routes.get(project_id)
+
+    def _cluster_for(self, project_id: str) -> str:
+        route = self._route(project_id)
+        if route and route.uri:
+            return self._cluster_by_uri.get(route.uri, DEFAULT_CLUSTER)
+        return DEFAULT_CLUSTER
+
+    def _build_project_db(self, project_id: str) -> AsyncIOMotorDatabase:
+        client = self._clients[self._cluster_for(project_id)]
+        db_name = f"{PROJECT_DB_PREFIX}{project_id}"
+        route = self._route(project_id)
+        if route and route.read_preference:
+            return client.get_database(db_name, read_preference=READ_PREFERENCES[route.read_preference])
+        return client[db_name]
+
     def get_project_db(self, project_id: str) -> AsyncIOMotorDatabase:
-        """Get a reference to a project-specific database."""
+        """Get a reference to a project-specific database (cached, routed per tenant)."""
         if not self.client:
             raise RuntimeError("Database client is not initialized.")
-        
-        db_name = f"babuai-{project_id}"
-        return self.client[db_name]
+
+        db = self._project_dbs.get(project_id)
+        if db is not None:
+            self._project_dbs.move_to_end(project_id)
+            return db
+
+        db = self._build_project_db(project_id)
+        self._project_dbs[project_id] = db
+        if len(self._project_dbs) > settings.mongo.project_db_cache_size:
+            evicted_id, evicted = self._project_dbs.popitem(last=False)
+            self._listeners[self._cluster_for(evicted_id)].forget(evicted.name)
+
+        if settings.mongo.ensure_indexes and db.name not in self._indexed_project_dbs:
+            # First use of this project in this process (it may be a brand new project)
+            self._indexed_project_dbs.add(db.name)
+            index_registry.ensure_in_background(db, PROJECT)
+        return db
 
     def get_master_db(self) -> AsyncIOMotorDatabase:
         if self.master_db is None:
             raise RuntimeError("Database client is not initialized.")
         return self.master_db
 
+    async def list_project_dbs(self) -> List[AsyncIOMotorDatabase]:
+        """All existing per-project databases, on whichever cluster each tenant is routed to."""
+        if not self.client:
+            raise RuntimeError("Database client is not initialized.")
+        dbs = []
+        for cluster, client in self._clients.items():
+            for name in await client.list_database_names():
+                if not name.startswith(PROJECT_DB_PREFIX) or name == settings.mongo.db_name:
+                    continue
+                project_id = name[len(PROJECT_DB_PREFIX):]
+                if self._cluster_for(project_id) == cluster:
+                    dbs.append(self._build_project_db(project_id))
+        return dbs
+
+    async def ensure_indexes(self):
+        """Create declared indexes on the master DB and every existing project DB."""
+        await index_registry.ensure(self.get_master_db(), MASTER)
+        for db in await self.list_project_dbs():
+            await index_registry.ensure(db, PROJECT)
+            self._indexed_project_dbs.add(db.name)
+
+    async def index_report(self) -> List[Dict[str, Any]]:
+        """Missing and unused indexes for the master DB and every project DB."""
+        reports = [await index_registry.report(self.get_master_db(), MASTER)]
+        for db in await self.list_project_dbs():
+            reports.append(await index_registry.report(db, PROJECT))
+        return reports
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage per cluster and in-flight commands per tenant database."""
+        clusters = {}
+        for cluster, listener in self._listeners.items():
+            stats = listener.snapshot()
+            stats["max_pool_size"] = (
+                settings.mongo.max_pool_size if cluster == DEFAULT_CLUSTER else settings.mongo.routed_max_pool_size
+            )
+            clusters[cluster] = stats
+
+        tenants = {}
+        for project_id, db in self._project_dbs.items():
+            cluster = self._cluster_for(project_id)
+            route = self._route(project_id)
+            tenants[project_id] = {
+                "cluster": cluster,
+                "read_preference": (route.read_preference if route else None) or "primary",
+                "in_flight_commands": clusters[cluster]["in_flight_commands"].get(db.name, 0),
+                "commands": clusters[cluster]["commands"].get(db.name, 0),
+            }
+
+        return {
+            "clusters": clusters,
+            "cached_project_dbs": len(self._project_dbs),
+            "project_db_cache_size": settings.mongo.project_db_cache_size,
+            "tenants": tenants,
+        }
+
 db_manager = DatabaseManager()
 
 async def get_database() -> AsyncIOMotorDatabase:
@@ -0,0 +1,40 @@
+import logging
+from typing import Any, Dict
+import httpx
+from mugeshbabu_agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class HttpClientManager:
+    """Shared outbound httpx client (and connection pool), created on first use."""
+    _client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.http.timeout, connect=settings.http.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.http.max_connections,
+                    max_keepalive_connections=settings.http.max_keepalive_connections,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            logger.info("Closing HTTP client")
+            await self._client.aclose()
+            self._client = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage (zeros until the client is first used)."""
+        connections = self._client._transport._pool.connections if self._client is not None else []
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "active": len(connections) - idle,
+            "idle": idle,
+            "max_connections": settings.http.max_connections,
+        }
+
+http_client = HttpClientManager()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Database scopes an index can be declared for
+MASTER = "master"   # The master database (settings.mongo.db_name)
+PROJECT = "project" # Every per-project `babuai-{project_id}` database
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Declarative description of a MongoDB index."""
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+    name: Optional[str] = None
+
+    @property
+    def index_name(self) -> str:
+        """Name MongoDB would generate for these keys, unless one is given."""
+        return self.name or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def to_model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.index_name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return IndexModel(list(self.keys), **options)
+
+class IndexRegistry:
+    """
+    Collects the indexes declared by repositories, per scope and collection.
+    Repositories declare them through `BaseRepository.indexes`.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, Dict[str, List[IndexSpec]]] = {MASTER: {}, PROJECT: {}}
+        self._background: Set[asyncio.Task] = set()
+
+    def register(self, scope: str, collection: str, specs: List[IndexSpec]):
+        if scope not in self._specs:
+            raise ValueError(f"Unknown index scope: {scope}")
+        declared = self._specs[scope].setdefault(collection, [])
+        for spec in specs:
+            if spec not in declared:
+                declared.append(spec)
+
+    def for_scope(self, scope: str) -> Dict[str, List[IndexSpec]]:
+        return self._specs[scope]
+
+    async def ensure(self, db: AsyncIOMotorDatabase, scope: str):
+        """
+        Create the declared indexes of a scope in `db`.
+        `createIndexes` is a no-op for indexes that already exist, so this is safe to repeat.
+        """
+        for collection, specs in self.for_scope(scope).items():
+            try:
+                await db[collection].create_indexes([spec.to_model() for spec in specs])
+            except OperationFailure as e:
+                # e.g. a unique index over existing duplicates, or an option conflict.
+                # Keep going so one bad index doesn't block the others or startup.
+                logger.error(f"Failed to ensure indexes on {db.name}.{collection}: {e}")
+        logger.info(f"Ensured {scope} indexes on {db.name}")
+
+    def ensure_in_background(self, db: AsyncIOMotorDatabase, scope: str):
+        """Schedule `ensure` without waiting for it (used on first access to a project DB)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        async def run():
+            try:
+                await self.ensure(db, scope)
+            except PyMongoError as e:
+                logger.error(f"Failed to ensure indexes on {db.name}: {e}")
+
+        task = loop.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def report(self, db: AsyncIOMotorDatabase, scope: str) -> Dict[str, Any]:
+        """
+        Compare declared indexes with the ones in `db`.
+        `missing` are declared but not present; `unused` have had no operations since the
+        server started (or since the index was built), according to `$indexStats`.
+        """
+        declared = self.for_scope(scope)
+        existing_collections = set(await db.list_collection_names())
+        collections: Dict[str, Any] = {}
+
+        for collection in sorted(existing_collections | set(declared)):
+            if collection.startswith("system."):
+                continue
+            entry: Dict[str, Any] = {"missing": [], "unused": []}
+
+            existing_keys = {}
+            if collection in existing_collections:
+                info = await db[collection].index_information()
+                # Directions compared as is: "text", "2dsphere" and "hashed" aren't numbers,
+                # and a numeric 1.0 from the server still equals 1
+                existing_keys = {tuple((f, d) for f, d in idx["key"]): name for name, idx in info.items()}
+
+                async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                    if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                        entry["unused"].append({"name": stat["name"], "since": stat["accesses"]["since"]})
+
+            for spec in declared.get(collection, []):
+                if spec.keys not in existing_keys:
+                    entry["missing"].append({"name": spec.index_name, "keys": dict(spec.keys)})
+
+            if entry["missing"] or entry["unused"]:
+                collections[collection] = entry
+
+        return {"database": db.name, "scope": scope, "collections": collections}
+
+index_registry = IndexRegistry()
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Any, Dict
+import redis.asyncio as redis
+from mugeshbabu_agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class RedisManager:
+    """Shared Redis client (and connection pool), created on first use."""
+    _client: redis.Redis | None = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(settings.redis.url, encoding="utf-8", decode_responses=True)
+        return self._client
+
+    async def ping(self, connections: int = 1):
+        """Ping Redis; concurrent pings open up to `connections` pooled connections."""
+        await asyncio.gather(*(self.client.ping() for _ in range(connections)))
+
+    async def close(self):
+        if self._client is not None:
+            logger.info("Closing Redis connection")
+            await self._client.aclose()
+            self._client = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage (zeros until the client is first used)."""
+        if self._client is None:
+            return {"in_use": 0, "available": 0, "max_connections": None}
+        pool = self._client.connection_pool
+        return {
+            "in_use": len(pool._in_use_connections),
+            "available": len(pool._available_connections),
+            "max_connections": pool.max_connections,
+        }
+
+redis_manager = RedisManager()
@@ -1,20 +1,101 @@
-from typing import TypeVar, Generic, Optional, List, Any, Dict
-from bson import ObjectId
+import base64
+from typing import TypeVar, Generic, Optional, List, Any, Dict, ClassVar, AsyncIterator, Sequence, Union
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.results import BulkWriteResult
+from mugeshbabu_agents.infrastructure.indexes import IndexSpec, index_registry, MASTER
 
 T = TypeVar("T", bound=BaseModel)
 
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor."""
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+class Update:
+    """
+    Builder for MongoDB update operators.
+
+        Update().set(status="QUEUED").inc("attempts").push("logs", line, slice=-100)
+    """
+
+    def __init__(self):
+        self._ops: Dict[str, Dict[str, Any]] = {}
+
+    def _op(self, operator: str, field: str, value: Any) -> "Update":
+        self._ops.setdefault(operator, {})[field] = value
+        return self
+
+    def set(self, **fields: Any) -> "Update":
+        for field, value in fields.items():
+            self._op("$set", field, value)
+        return self
+
+    def inc(self, field: str, amount: int | float = 1) -> "Update":
+        return self._op("$inc", field, amount)
+
+    def push(self, field: str, *values: Any, slice: Optional[int] = None) -> "Update":
+        """Append values to an array; `slice=-N` keeps only the last N elements."""
+        push: Dict[str, Any] = {"$each": list(values)}
+        if slice is not None:
+            push["$slice"] = slice
+        return self._op("$push", field, push)
+
+    def set_on_insert(self, **fields: Any) -> "Update":
+        """Fields written only when an upsert creates the document."""
+        for field, value in fields.items():
+            self._op("$setOnInsert", field, value)
+        return self
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return self._ops
+
+class Page(BaseModel):
+    """One page of a keyset-paginated listing."""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
 class BaseRepository(Generic[T]):
+    # Index declarations. Subclasses set `collection_name` (and `db_scope` for
+    # per-project collections) and list their indexes; they are created at startup.
+    collection_name: ClassVar[Optional[str]] = None
+    db_scope: ClassVar[str] = MASTER
+    indexes: ClassVar[List[IndexSpec]] = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.collection_name and cls.indexes:
+            index_registry.register(cls.db_scope, cls.collection_name, cls.indexes)
+
     def __init__(self, db: AsyncIOMotorDatabase, collection_name: str, model_cls: type[T]):
         self.collection = db[collection_name]
         self.model_cls = model_cls
 
-    async def create(self, item: T) -> T:
-        """Insert a new item."""
+    def _to_document(self, item: T) -> Dict[str, Any]:
         data = item.model_dump(by_alias=True, exclude_none=True)
         if "_id" in data and data["_id"] is None:
             del data["_id"]
+        return data
+
+    async def create(self, item: T) -> T:
+        """Insert a new item."""
+        data = self._to_document(item)
             
         result = await self.collection.insert_one(data)
         
@@ -24,7 +105,34 @@ class BaseRepository(Generic[T]):
             
         return item
 
-    async def get(self, id: str | ObjectId) -> Optional[T]:
+    async def create_many(self, items: List[T], ordered: bool = True) -> List[T]:
+        """
+        Insert several items with a single round trip.
+        With `ordered=False` the server keeps inserting after a failed document.
+        """
+        if not items:
+            return items
+
+        docs = [self._to_document(item) for item in items]
+        result = await self.collection.insert_many(docs, ordered=ordered)
+
+        for item, inserted_id in zip(items, result.inserted_ids):
+            if hasattr(item, "id"):
+                item.id = inserted_id
+
+        return items
+
+    def _decode(self, doc: Dict[str, Any], trusted: bool = False) -> T:
+        """
+        Build a model from a stored document.
+        `trusted` skips validation (`model_construct`) for data this service wrote itself;
+        nested models are then left as plain dicts.
+        """
+        if trusted:
+            return self.model_cls.model_construct(**doc)
+        return self.model_cls(**doc)
+
+    async def get(self, id: str | ObjectId, trusted: bool = False) -> Optional[T]:
         """Get an item by ID."""
         if isinstance(id, str):
             if not ObjectId.is_valid(id):
@@ -33,10 +141,10 @@ class BaseRepository(Generic[T]):
             
         doc = await self.collection.find_one({"_id": id})
         if doc:
-            return self.model_cls(**doc)
+            return self._decode(doc, trusted)
         return None
 
-    async def list(self, filter: Dict[str, Any] = None, limit: int = 100, skip: int = 0) -> List[T]:
+    async def list(self, filter: Dict[str, Any] = None, limit: int = 100, skip: int = 0, trusted: bool = False) -> List[T]:
         """List items with optional filter."""
         if filter is None:
             filter = {}
@@ -44,22 +152,183 @@ class BaseRepository(Generic[T]):
         cursor = self.collection.find(filter).skip(skip).limit(limit)
         items = []
         async for doc in cursor:
-            items.append(self.model_cls(**doc))
+            items.append(self._decode(doc, trusted))
         return items
 
-    async def update(self, id: str | ObjectId, update_data: Dict[str, Any]) -> Optional[T]:
-        """Update an item by ID."""
+    async def page(
+        self,
+        filter: Dict[str, Any] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_key: str = "_id",
+        descending: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
+        trusted: bool = False,
+    ) -> Page:
+        """
+        Keyset pagination ordered by `sort_key` then `_id`.
+        Unlike `skip`, the cost of a page doesn't grow with its depth. Pass the returned
+        `next_cursor` to get the following page. With a `projection`, items are raw documents.
+        """
+        direction = -1 if descending else 1
+        op = "$lt" if descending else "$gt"
+        sort = [(sort_key, direction)] if sort_key == "_id" else [(sort_key, direction), ("_id", direction)]
+
+        query = filter or {}
+        if cursor:
+            after = decode_cursor(cursor)
+            if "id" not in after or (sort_key != "_id" and "key" not in after):
+                raise InvalidCursorError("Invalid cursor")
+            if sort_key == "_id":
+                keyset = {"_id": {op: after["id"]}}
+            else:
+                keyset = {"$or": [
+                    {sort_key: {op: after["key"]}},
+                    {sort_key: after["key"], "_id": {op: after["id"]}},
+                ]}
+            query = {"$and": [query, keyset]} if query else keyset
+
+        if projection and any(projection.values()) and sort_key not in projection:
+            # Inclusion projection: the sort key is needed to build the next cursor
+            projection = {**projection, sort_key: 1}
+
+        docs = await self.collection.find(query, projection).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            values = {"id": last["_id"]}
+            if sort_key != "_id":
+                values["key"] = last.get(sort_key)
+            next_cursor = encode_cursor(values)
+
+        items = docs if projection is not None else [self._decode(doc, trusted) for doc in docs]
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def get_many(
+        self,
+        ids: Sequence[str | ObjectId],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Union[T, Dict[str, Any]]]:
+        """
+        Get several items by ID in one query, in the order of `ids`. Missing ids are skipped.
+        With a `projection`, raw documents are returned since partial documents can't be validated.
+        """
+        object_ids = [
+            i if isinstance(i, ObjectId) else ObjectId(i)
+            for i in ids if isinstance(i, ObjectId) or ObjectId.is_valid(i)
+        ]
+        if not object_ids:
+            return []
+
+        docs = {}
+        async for doc in self.collection.find({"_id": {"$in": object_ids}}, projection):
+            docs[doc["_id"]] = doc
+
+        return [
+            doc if projection is not None else self.model_cls(**doc)
+            for doc in (docs.get(oid) for oid in object_ids) if doc is not None
+        ]
+
+    async def stream(
+        self,
+        filter: Dict[str, Any] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 500,
+        sort: Optional[List[tuple]] = None,
+    ) -> AsyncIterator[Union[T, Dict[str, Any]]]:
+        """
+        Iterate over every matching item without loading the result set in memory.
+        Documents are fetched from the server `batch_size` at a time. With a `projection`
+        (`{}` for whole documents), raw documents are yielded instead of models.
+        """
+        cursor = self.collection.find(filter or {}, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        async for doc in cursor:
+            yield doc if projection is not None else self.model_cls(**doc)
+
+    async def bulk_write(self, operations: List[Any], ordered: bool = False) -> BulkWriteResult:
+        """Run pymongo write operations (InsertOne, UpdateOne, ReplaceOne, ...) in one round trip."""
+        return await self.collection.bulk_write(operations, ordered=ordered)
+
+    async def upsert_many(self, items: List[T], key_fields: Sequence[str] = ("_id",)) -> BulkWriteResult:
+        """
+        Insert or replace several items in one round trip.
+        Items are matched on `key_fields` (stored names, e.g. `_id` or `email`). When
+        `_id` isn't a key, an existing document keeps its `_id` (it is immutable) and
+        the item's fields are `$set` on it; `_id` is only used when inserting.
+        """
+        operations = []
+        for item in items:
+            data = self._to_document(item)
+            filter = {field: data.get(field) for field in key_fields}
+            if "_id" in key_fields:
+                operations.append(ReplaceOne(filter, data, upsert=True))
+                continue
+            _id = data.pop("_id", None)
+            update: Dict[str, Any] = {"$set": data}
+            if _id is not None:
+                update["$setOnInsert"] = {"_id": _id}
+            operations.append(UpdateOne(filter, update, upsert=True))
+        return await self.bulk_write(operations)
+
+    async def update(
+        self,
+        id: str | ObjectId,
+        update_data: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+    ) -> Optional[Union[T, Dict[str, Any]]]:
+        """
+        `$set` fields on an item and return it as stored after the update, in one round trip.
+        Returns None only when no item matched (and `upsert` is False).
+        """
+        return await self.update_ops(id, Update().set(**update_data), projection=projection, upsert=upsert)
+
+    async def update_ops(
+        self,
+        id: str | ObjectId,
+        update: Union["Update", Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+        trusted: bool = False,
+    ) -> Optional[Union[T, Dict[str, Any]]]:
+        """
+        Apply update operators (`$set`, `$inc`, `$push`, `$setOnInsert`, ...) to an item
+        with `find_one_and_update` and return the updated item.
+        With a `projection`, the raw projected document is returned.
+        """
         if isinstance(id, str):
             id = ObjectId(id)
-            
-        result = await self.collection.update_one(
+        if isinstance(update, Update):
+            update = update.to_dict()
+
+        doc = await self.collection.find_one_and_update(
             {"_id": id},
-            {"$set": update_data}
+            update,
+            projection=projection,
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count > 0:
-            return await self.get(id)
-        return None
+        if doc is None:
+            return None
+        return doc if projection is not None else self._decode(doc, trusted)
+
+    async def upsert(
+        self,
+        id: str | ObjectId,
+        update: Union["Update", Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Union[T, Dict[str, Any]]:
+        """Update an item, creating it if it doesn't exist (see `Update.set_on_insert`)."""
+        return await self.update_ops(id, update, projection=projection, upsert=True)
+
+    async def update_many(self, filter: Dict[str, Any], update_data: Dict[str, Any]) -> int:
+        """Apply the same `$set` to every matching item. Returns the matched count."""
+        result = await self.collection.update_many(filter, {"$set": update_data})
+        return result.matched_count
 
     async def delete(self, id: str | ObjectId) -> bool:
         """Delete an item by ID."""
@@ -2,9 +2,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mugeshbabu_agents.core.config import settings
+from mugeshbabu_agents.core.serialization import FastJSONResponse
 from mugeshbabu_agents.core.middleware import AuthMiddleware
-from mugeshbabu_agents.infrastructure.db import db_manager
-from mugeshbabu_agents.api.v1 import agents, chat, documents, teams, auth
+from mugeshbabu_agents.core.admission import AdmissionControlMiddleware
+from mugeshbabu_agents.core.metrics import MetricsMiddleware
+from mugeshbabu_agents.core.profiling import ProfilingMiddleware
+from mugeshbabu_agents.core.lifecycle import resource_manager
+from mugeshbabu_agents.api.v1 import agents, chat, documents, teams, auth, admin
+from mugeshbabu_agents.api import metrics
 from mugeshbabu_agents.core.exceptions import global_exception_handler, http_exception_handler, validation_exception_handler
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -22,11 +27,11 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up BabuAI Agents Service...")
-    await db_manager.connect()
+    await resource_manager.startup()
     yield
     # Shutdown
     logger.info("Shutting down BabuAI Agents Service...")
-    await db_manager.close()
+    await resource_manager.shutdown()
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -42,14 +47,6 @@ def create_app() -> FastAPI:
     app.add_exception_handler(StarletteHTTPException, http_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     
-    # Rate Limiting
-    from slowapi.errors import RateLimitExceeded
-    from slowapi import _rate_limit_exceeded_handler
-    from mugeshbabu_agents.core.rate_limit import limiter
-    
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
     # CORS Middleware
     app.add_middleware(
         CORSMiddleware,
@@ -59,9 +56,19 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # On-demand profiling; inside auth so `X-Profile` can be restricted to admins
+    if settings.profiling.enabled:
+        app.add_middleware(ProfilingMiddleware)
+
     # Auth Middleware (JWT)
     # Public paths are excluded inside the middleware class (health, docs, etc.)
-    app.add_middleware(AuthMiddleware)
+    app.add_middleware(AuthMiddleware, public_paths=[settings.metrics.path] if settings.metrics.enabled else [])
+
+    # Admission control runs before auth and routing so overload is shed before any other work
+    app.add_middleware(AdmissionControlMiddleware)
+
+    # Outermost, so shed and unauthenticated requests are timed too
+    app.add_middleware(MetricsMiddleware)
 
     # Include Routers
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
@@ -69,10 +76,20 @@ def create_app() -> FastAPI:
     app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
     app.include_router(documents.router, prefix="/api/v1/documents", tags=["Documents"])
     app.include_router(teams.router, prefix="/api/v1/teams", tags=["Teams"])
+    app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
+    if settings.metrics.enabled:
+        app.include_router(metrics.router)
 
     @app.get("/health")
     async def health_check():
-        return {"status": "ok", "version": "0.1.0", "env": settings.app.env}
+        """Liveness: the process is up and serving, whatever the state of its dependencies."""
+        return {"status": "ok", "version": "0.1.0", "env": settings.app.env, **resource_manager.liveness()}
+
+    @app.get("/health/ready")
+    async def readiness_check():
+        """Readiness: 503 while starting, draining, or when a required resource is down."""
+        ready, report = await resource_manager.readiness()
+        return FastJSONResponse(status_code=200 if ready else 503, content=report)
 
     return app
 